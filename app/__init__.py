@@ -104,6 +104,7 @@ def create_app():
         'update_goal_status': "12 per minute",
         'api_create_event': "10 per minute",
         'api_note': "100 per minute",
+        'api_notes': "100 per minute",
     }
 
     for endpoint_name, limit_str in protected_endpoints.items():
@@ -114,6 +115,12 @@ def create_app():
                 exempt_when=check_auth
             )(original_func)
 
+    # ========= CLI =========
+    from .goal_tree import backfill_goal_paths_command
+    app.cli.add_command(backfill_goal_paths_command)
+    from .tasks import ensure_rolled_over, rollover_tasks_command
+    app.cli.add_command(rollover_tasks_command)
+
     # ========= JINJA =========
     def get_current_sunday_week():
         today = datetime.now().date()
@@ -126,6 +133,14 @@ def create_app():
     with app.app_context():
         os.makedirs(app.instance_path, exist_ok=True)
         db.create_all()
+        from .backup import backup_dir_for, sweep_stale_partials
+        for name in sweep_stale_partials(backup_dir_for(app)):
+            app.logger.info(f"Removed stale partial backup: {name}")
+        try:
+            ensure_rolled_over()
+        except Exception as e:   # never block startup — the first request retries
+            db.session.rollback()
+            app.logger.warning(f"Task rollover skipped at startup: {e}")
 
     return app
 
@@ -0,0 +1,399 @@
+# app/backup.py
+import gzip
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+try:  # optional — zstd backups only when the package is installed
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BACKUP_PAGES_PER_STEP = 256       # pages copied per backup() step — progress is reported per step
+BACKUP_STEP_SLEEP = 0.005         # seconds to yield between steps
+BACKUP_KEEP = int(os.getenv('WFM_BACKUP_KEEP', '10'))
+BACKUP_EXTENSIONS = ('.db', '.db.gz', '.db.zst')
+BACKUP_STALE_SECONDS = 15 * 60    # a .partial nobody has written to for this long is an orphan
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_latest_job_id = None
+
+
+def backup_dir_for(app):
+    return os.path.join(app.instance_path, 'backups')
+
+
+def sqlite_path_for(app):
+    """Path of the live SQLite file, or None when running on another database."""
+    from . import db
+    url = db.engine.url
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return None
+    return url.database
+
+
+def compression_options():
+    return ['gzip', 'zstd'] if zstandard else ['gzip']
+
+
+def list_backups(backup_dir):
+    """Backup files, newest first: [{'name', 'size', 'modified'}]."""
+    if not os.path.isdir(backup_dir):
+        return []
+    backups = []
+    for name in os.listdir(backup_dir):
+        path = os.path.join(backup_dir, name)
+        if name.startswith('backup_') and name.endswith(BACKUP_EXTENSIONS) and os.path.isfile(path):
+            stat = os.stat(path)
+            backups.append({
+                'name': name,
+                'size': stat.st_size,
+                'modified': datetime.fromtimestamp(stat.st_mtime),
+            })
+    backups.sort(key=lambda b: b['modified'], reverse=True)
+    return backups
+
+
+def prune_backups(backup_dir, keep=BACKUP_KEEP):
+    """Delete all but the newest `keep` backups. Returns the names removed."""
+    removed = []
+    for backup in list_backups(backup_dir)[keep:]:
+        os.remove(os.path.join(backup_dir, backup['name']))
+        removed.append(backup['name'])
+    return removed
+
+
+def sweep_stale_partials(backup_dir, max_age=BACKUP_STALE_SECONDS):
+    """
+    Delete half-written backups left behind by a process that died mid-copy
+    (the worker threads are daemons). A running backup touches its file every
+    step, so anything untouched for max_age seconds is an orphan.
+    Returns the names removed.
+    """
+    if not os.path.isdir(backup_dir):
+        return []
+    removed = []
+    cutoff = time.time() - max_age
+    for name in os.listdir(backup_dir):
+        if not (name.startswith('.backup_') or name.startswith('backup_')) or '.partial' not in name:
+            continue
+        path = os.path.join(backup_dir, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed.append(name)
+        except OSError:
+            pass  # raced with another worker — fine either way
+    return removed
+
+
+def _update(job_id, **fields):
+    with _jobs_lock:
+        _jobs[job_id].update(fields)
+
+
+def get_job(job_id=None):
+    """A copy of one job's status (default: the latest), or None."""
+    with _jobs_lock:
+        job = _jobs.get(job_id or _latest_job_id)
+        return dict(job) if job else None
+
+
+def _compress(src_path, dest_path, compression):
+    with open(src_path, 'rb') as src:
+        if compression == 'zstd':
+            with open(dest_path, 'wb') as dest:
+                zstandard.ZstdCompressor(level=3).copy_stream(src, dest)
+        else:
+            with gzip.open(dest_path, 'wb', compresslevel=6) as dest:
+                shutil.copyfileobj(src, dest, 1024 * 1024)
+
+
+def _run_backup(job_id, db_path, backup_dir, filename, compression, logger):
+    """Worker thread: page-by-page online copy, optional compression, then pruning."""
+    tmp_path = os.path.join(backup_dir, f".{filename}.partial")
+    final_path = os.path.join(backup_dir, filename)
+
+    def progress(status, remaining, total):
+        _update(job_id, pages_total=total, pages_done=total - remaining)
+
+    try:
+        src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        dest = sqlite3.connect(tmp_path)
+        try:
+            # Pin ONE read transaction for the whole copy. Without it every write
+            # the app commits between steps restarts backup() from page 0, so a
+            # busy DB never finishes. With it the copy is one consistent snapshot;
+            # in WAL mode writers carry on, in rollback mode they wait it out.
+            src.execute('BEGIN')
+            src.execute('SELECT count(*) FROM sqlite_master').fetchone()
+            src.backup(dest, pages=BACKUP_PAGES_PER_STEP, progress=progress, sleep=BACKUP_STEP_SLEEP)
+        finally:
+            dest.close()
+            src.close()  # ends the read transaction
+
+        if compression:
+            _update(job_id, status='compressing')
+            _compress(tmp_path, final_path + '.partial', compression)
+            os.remove(tmp_path)
+            os.replace(final_path + '.partial', final_path)
+        else:
+            os.replace(tmp_path, final_path)
+
+        pruned = prune_backups(backup_dir)
+        _update(
+            job_id, status='done', size=os.path.getsize(final_path),
+            pruned=pruned, finished_at=datetime.now().isoformat()
+        )
+        logger.info(f"Backup created: {filename} (pruned {len(pruned)})")
+    except Exception as e:
+        for leftover in (tmp_path, final_path + '.partial'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        _update(job_id, status='failed', error=str(e), finished_at=datetime.now().isoformat())
+        logger.error(f"Backup failed: {e}")
+
+
+def start_backup(app, compression=None):
+    """
+    Kick off a background backup of the live SQLite DB and return its job dict
+    right away. Raises ValueError if there's nothing to back up.
+    """
+    global _latest_job_id
+
+    db_path = sqlite_path_for(app)
+    if db_path is None or not os.path.exists(db_path):
+        raise ValueError("Database file not found!")
+    if compression and compression not in compression_options():
+        raise ValueError(f"Unsupported compression: {compression}")
+
+    backup_dir = backup_dir_for(app)
+    os.makedirs(backup_dir, exist_ok=True)
+
+    job_id = uuid.uuid4().hex[:12]
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    ext = {'gzip': '.db.gz', 'zstd': '.db.zst'}.get(compression, '.db')
+    # Job id in the name — two backups started in the same second get their own files
+    filename = f"backup_{timestamp}_{job_id}{ext}"
+
+    job = {
+        'id': job_id, 'status': 'running', 'filename': filename,
+        'compression': compression, 'pages_done': 0, 'pages_total': None,
+        'started_at': datetime.now().isoformat(), 'finished_at': None, 'error': None,
+    }
+    with _jobs_lock:
+        _jobs[job_id] = job
+        _latest_job_id = job_id
+        for old_id in list(_jobs)[:-20]:  # status history, not a log — keep it small
+            del _jobs[old_id]
+
+    thread = threading.Thread(
+        target=_run_backup,
+        args=(job_id, db_path, backup_dir, filename, compression, app.logger),
+        name=f"backup-{job_id}",
+        daemon=True,
+    )
+    thread.start()
+    return dict(job)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# RESTORE
+# ──────────────────────────────────────────────────────────────────────────────
+RESTORE_CHUNK_BYTES = 1024 * 1024
+RESTORE_MAX_BYTES = int(os.getenv('WFM_RESTORE_MAX_MB', '1024')) * 1024 * 1024
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+
+class RestoreError(ValueError):
+    """The upload / backup can't be restored — message is safe to show the user."""
+
+
+def _open_decompressed(fp, name):
+    """Wrap a binary stream so reads come out decompressed, by file extension."""
+    name = name.lower()
+    if name.endswith('.gz'):
+        return gzip.GzipFile(fileobj=fp, mode='rb')
+    if name.endswith('.zst'):
+        if zstandard is None:
+            raise RestoreError("zstd backups need the zstandard package installed")
+        return zstandard.ZstdDecompressor().stream_reader(fp)
+    if name.endswith('.db'):
+        return fp
+    raise RestoreError("File must be a .db, .db.gz or .db.zst SQLite backup")
+
+
+def stage_restore(fp, name, db_path):
+    """
+    Stream a backup (upload or file on disk) into a temp file next to the live
+    DB, one chunk at a time — never the whole thing in memory. Same directory
+    so the later os.replace() is atomic. Returns the staged path.
+    """
+    staged_path = f"{db_path}.restore-{uuid.uuid4().hex[:8]}"
+    written = 0
+    try:
+        src = _open_decompressed(fp, name)
+        with open(staged_path, 'wb') as dest:
+            while True:
+                chunk = src.read(RESTORE_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if written == 0 and not chunk.startswith(SQLITE_HEADER):
+                    raise RestoreError("Not a valid SQLite database")
+                written += len(chunk)
+                if written > RESTORE_MAX_BYTES:
+                    raise RestoreError(f"Backup too large (max {RESTORE_MAX_BYTES // (1024 * 1024)}MB)")
+                dest.write(chunk)
+        if written == 0:
+            raise RestoreError("Backup file is empty")
+    except (OSError, EOFError) as e:
+        _discard(staged_path)
+        raise RestoreError(f"Could not read backup: {e}") from e
+    except Exception:
+        _discard(staged_path)
+        raise
+    return staged_path
+
+
+def _missing_schema(conn):
+    """Model tables / columns the SQLite file doesn't have."""
+    from . import db
+    missing = []
+    for table in db.metadata.sorted_tables:
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{table.name}")')}
+        if not columns:
+            missing.append(table.name)
+        else:
+            missing.extend(f"{table.name}.{c.name}" for c in table.columns if c.name not in columns)
+    return missing
+
+
+def _schema_revision(conn):
+    """The file's Alembic revision — None when it predates migrations (or was built by create_all)."""
+    try:
+        row = conn.execute('SELECT version_num FROM alembic_version').fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def _alembic_config(app):
+    from alembic.config import Config
+    directory = app.extensions['migrate'].directory
+    if not os.path.isabs(directory):
+        directory = os.path.join(os.path.dirname(app.root_path), directory)
+    config = Config()
+    config.set_main_option('script_location', directory)
+    return config
+
+
+def upgrade_staged(app, path, revision):
+    """
+    Run the app's migrations on a staged copy (never the live DB) so a backup
+    from an older version restores into today's schema. revision is the copy's
+    Alembic revision; None means it predates migrations, which is where they
+    start — each one skips what the file already has.
+    """
+    from alembic import command
+    from alembic.script import ScriptDirectory
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import NullPool
+
+    config = _alembic_config(app)
+    known = {script.revision for script in ScriptDirectory.from_config(config).walk_revisions()}
+    if revision is not None and revision not in known:
+        raise RestoreError(
+            f"Backup comes from a newer or unknown version of the app (schema revision {revision}) — it can't be restored here"
+        )
+
+    engine = create_engine(f"sqlite:///{path}", poolclass=NullPool)
+    try:
+        with app.app_context(), engine.begin() as connection:
+            config.attributes['connection'] = connection
+            command.upgrade(config, 'head')
+    except Exception as e:
+        app.logger.exception("Upgrading a restored backup failed")
+        raise RestoreError("Backup is from an older version of the app and couldn't be upgraded — see the server log") from e
+    finally:
+        engine.dispose()
+
+
+def validate_sqlite(path, app):
+    """
+    PRAGMA integrity_check, then the schema. A backup from an older version of
+    the app (a known migration revision, or from before migrations) is upgraded
+    in the staged copy; anything still missing a model table or column — a DB
+    from some other app — is refused, not swapped in.
+    """
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            result = [row[0] for row in conn.execute('PRAGMA integrity_check').fetchall()]
+            if result != ['ok']:
+                raise RestoreError(f"Integrity check failed: {'; '.join(result[:3])}")
+            missing = _missing_schema(conn)
+            revision = _schema_revision(conn)
+            ours = any(
+                conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+                for table in ('goal', 'task', 'note', 'event')
+            )
+        finally:
+            conn.close()
+
+        if missing and ours:
+            upgrade_staged(app, path, revision)
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                missing = _missing_schema(conn)
+            finally:
+                conn.close()
+        if missing:
+            raise RestoreError(f"Schema doesn't match this app — missing: {', '.join(missing[:10])}")
+    except sqlite3.DatabaseError as e:
+        raise RestoreError(f"Not a valid SQLite database: {e}") from e
+
+
+def _discard(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def restore_database(app, fp, name):
+    """
+    Stage → validate (upgrading a backup from an older version) → swap. The
+    live file is only touched once the staged copy has passed every check, and then by one atomic rename. The engine pool is
+    disposed first so no worker keeps writing to the old inode.
+    Raises RestoreError on anything the user should hear about.
+    """
+    from . import db
+
+    db_path = sqlite_path_for(app)
+    if db_path is None:
+        raise RestoreError("Restore only works with the SQLite database")
+
+    staged_path = stage_restore(fp, name, db_path)
+    try:
+        validate_sqlite(staged_path, app)
+
+        db.session.remove()
+        db.engine.dispose()
+        # A leftover WAL from the old DB would be replayed into the new one
+        for suffix in ('-wal', '-shm', '-journal'):
+            _discard(db_path + suffix)
+        os.replace(staged_path, db_path)
+    finally:
+        _discard(staged_path)
+
+
+def restore_backup(app, name):
+    """Restore one of list_backups() by name — no re-upload."""
+    backup_dir = backup_dir_for(app)
+    if name not in {b['name'] for b in list_backups(backup_dir)}:  # also blocks ../ tricks
+        raise RestoreError("Backup not found")
+    with open(os.path.join(backup_dir, name), 'rb') as fp:
+        restore_database(app, fp, name)
@@ -0,0 +1,447 @@
+# app/calendar_import.py
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+import requests
+from dateutil.tz import tzutc
+from pytz import timezone
+from sqlalchemy import delete, insert, tuple_, update
+from . import db
+from .ics_tokenizer import READ_CHUNK_BYTES, iter_file_chunks, iter_vevents
+from .models import Event
+from .recurrence import compile_series
+from .transfer import record_tombstones
+
+CENTRAL = timezone("America/Chicago")
+FEED_TIMEOUT = 30
+KEY_LOOKUP_CHUNK = 400   # (uid, instance) pairs per IN (...) — well under SQLite's variable limit
+
+# Outlook writes Windows zone names in TZID
+_OUTLOOK_TZ_MAP = {
+    "Eastern Standard Time": "America/New_York",
+    "Eastern Daylight Time": "America/New_York",
+    "Central Standard Time": "America/Chicago",
+    "Central Daylight Time": "America/Chicago",
+    "Pacific Standard Time": "America/Los_Angeles",
+    "Mountain Standard Time": "America/Denver",
+    "India Standard Time": "Asia/Kolkata",
+}
+
+# Lines that change on every feed render without the event changing
+_VOLATILE_PROPS = ('DTSTAMP', 'LAST-MODIFIED')
+
+_DURATION_RE = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?')
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# VALUE PARSING
+# ──────────────────────────────────────────────────────────────────────────────
+def parse_dt(val, tzid=None, is_date=False):
+    """ICS date / date-time → date, or an aware datetime in Central time."""
+    val = val.split(':')[-1]
+    is_utc = val.endswith('Z')
+    val = val[:-1] if is_utc else val
+    # Fixed-width fields — slicing is several times faster than strptime
+    if is_date or len(val) == 8:
+        return date(int(val[:4]), int(val[4:6]), int(val[6:8]))
+    if len(val) < 15 or val[8] != 'T':
+        raise ValueError(f"Bad ICS date-time: {val!r}")
+    dt = datetime(
+        int(val[:4]), int(val[4:6]), int(val[6:8]),
+        int(val[9:11]), int(val[11:13]), int(val[13:15])
+    )
+    if tzid and tzid in _OUTLOOK_TZ_MAP:
+        tz = timezone(_OUTLOOK_TZ_MAP[tzid])
+        if tz is CENTRAL:
+            return CENTRAL.localize(dt)  # already Central — skip the round trip
+        dt = tz.localize(dt)
+    elif is_utc:
+        dt = dt.replace(tzinfo=tzutc())
+    else:
+        return CENTRAL.localize(dt)
+    return dt.astimezone(CENTRAL)
+
+
+def compute_end(start, end_dt, duration):
+    if end_dt:
+        if end_dt.tzinfo is None:
+            end_dt = CENTRAL.localize(end_dt)
+        return end_dt.astimezone(CENTRAL)
+    if duration:
+        match = _DURATION_RE.match(duration)
+        if match:
+            h = int(match.group(1) or 0)
+            m = int(match.group(2) or 0)
+            return start + timedelta(hours=h, minutes=m)
+    return start + timedelta(hours=1)
+
+
+def to_date(dt):
+    return dt.date() if hasattr(dt, 'date') else dt
+
+
+def instance_key(original_start):
+    """Event.source_instance for one occurrence: '' for a one-off, else its original start."""
+    if original_start is None:
+        return ''
+    if not isinstance(original_start, datetime):
+        return original_start.strftime('%Y%m%d')
+    return original_start.strftime('%Y%m%dT%H%M%S')
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# VEVENTS — tokenized by ics_tokenizer.iter_vevents(): {NAME: [(params, value), ...]}
+# ──────────────────────────────────────────────────────────────────────────────
+def _first(props, name):
+    values = props.get(name)
+    return values[0][1] if values else None
+
+
+def vevent_identity(props):
+    """
+    (uid, recurrence_id, sequence, digest) without parsing the event.
+    The digest skips DTSTAMP & co, which most servers restamp on every fetch.
+    """
+    sequence = _first(props, 'SEQUENCE') or '0'
+    digest = hashlib.sha1()
+    for name, values in props.items():
+        if name in _VOLATILE_PROPS:
+            continue
+        for params, value in values:
+            digest.update(f"{name}{sorted(params.items())}:{value}\n".encode('utf-8'))
+    return (
+        _first(props, 'UID'),
+        _first(props, 'RECURRENCE-ID'),
+        int(sequence) if sequence.strip().isdigit() else 0,
+        digest.hexdigest(),
+    )
+
+
+def _unescape(value):
+    return value.replace('\\n', '\n').replace('\\N', '\n').replace('\\,', ',').replace('\\;', ';')
+
+
+def parse_vevent(props):
+    """One tokenized VEVENT → the event dict the importer works with."""
+    event = {
+        "UID": None, "SUMMARY": "", "DTSTART": None, "DTEND": None,
+        "DURATION": None, "RRULE": None, "EXDATE": [],
+        "LOCATION": "", "DESCRIPTION": "", "AllDay": False,
+        "RECURRENCE-ID": None, "SEQUENCE": 0,
+    }
+    for key, values in props.items():
+        for params, value in values:
+            is_date = params.get("VALUE") == "DATE"
+
+            if key == "SUMMARY": event["SUMMARY"] = _unescape(value)
+            elif key == "LOCATION": event["LOCATION"] = _unescape(value)
+            elif key == "DESCRIPTION": event["DESCRIPTION"] = _unescape(value)
+            elif key == "UID": event["UID"] = value
+            elif key == "RRULE": event["RRULE"] = value
+            elif key == "EXDATE":
+                for ex in value.split(','):
+                    event["EXDATE"].append(parse_dt(ex, params.get("TZID"), is_date))
+            elif key == "DTSTART":
+                event["DTSTART"] = parse_dt(value, params.get("TZID"), is_date)
+                event["AllDay"] = is_date
+            elif key == "DTEND":
+                event["DTEND"] = parse_dt(value, params.get("TZID"), is_date)
+            elif key == "DURATION": event["DURATION"] = value
+            elif key == "RECURRENCE-ID":
+                event["RECURRENCE-ID"] = parse_dt(value, params.get("TZID"))
+            elif key == "SEQUENCE":
+                event["SEQUENCE"] = int(value) if value.strip().isdigit() else 0
+    return event
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# FEED CACHE + EVENT STORE
+# ──────────────────────────────────────────────────────────────────────────────
+class FeedCache:
+    """
+    The raw feed on disk plus its ETag / Last-Modified, so a refresh is a
+    conditional GET — an unchanged feed comes back as an empty 304.
+    """
+
+    def __init__(self, url, cache_dir):
+        self.url = url
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+        self.body_path = os.path.join(cache_dir, f"{name}.ics")
+        self.meta_path = os.path.join(cache_dir, f"{name}.json")
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _meta(self):
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def chunks(self):
+        """The cached feed, streamed back in chunks."""
+        with open(self.body_path, 'rb') as f:
+            yield from iter_file_chunks(f)
+
+    def fetch(self):
+        """
+        Returns (chunks, version, status) where status is 'not_modified',
+        'downloaded' or 'stale' (network failed, cached copy used).
+        The body is streamed to disk — never held in memory whole.
+        """
+        meta = self._meta()
+        have_body = os.path.exists(self.body_path) and meta.get('version')
+        headers = {}
+        if have_body:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        tmp_path = self.body_path + '.partial'
+        try:
+            with requests.get(self.url, headers=headers, timeout=FEED_TIMEOUT, stream=True) as response:
+                if response.status_code == 304 and have_body:
+                    return self.chunks(), meta['version'], 'not_modified'
+                response.raise_for_status()
+
+                version = hashlib.sha1()
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(READ_CHUNK_BYTES):
+                        version.update(chunk)
+                        f.write(chunk)
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except requests.RequestException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if have_body:
+                return self.chunks(), meta['version'], 'stale'
+            raise
+
+        os.replace(tmp_path, self.body_path)
+        version = version.hexdigest()
+        with open(self.meta_path, 'w') as f:
+            json.dump({
+                'etag': etag,
+                'last_modified': last_modified,
+                'version': version,
+                'fetched_at': datetime.utcnow().isoformat(),
+            }, f)
+        return self.chunks(), version, 'downloaded'
+
+
+class EventStore:
+    """
+    Parsed VEVENTs keyed by (UID, RECURRENCE-ID). A re-sync only parses blocks
+    whose SEQUENCE or content digest moved; everything else is reused as is.
+    """
+
+    def __init__(self):
+        self.entries = {}   # (uid, recurrence_id) → {'sequence', 'digest', 'event'}
+        self.version = None
+
+    def sync(self, chunks, version):
+        stats = {'parsed': 0, 'reused': 0, 'removed': 0}
+        if version == self.version:
+            stats['reused'] = len(self.entries)
+            return stats
+
+        seen = {}
+        for index, props in enumerate(iter_vevents(chunks)):
+            uid, recurrence_id, sequence, digest = vevent_identity(props)
+            key = (uid or f"#{index}", recurrence_id)   # no UID → position is all we have
+            entry = self.entries.get(key)
+            if entry and entry['sequence'] == sequence and entry['digest'] == digest:
+                stats['reused'] += 1
+            else:
+                entry = {'sequence': sequence, 'digest': digest, 'event': parse_vevent(props)}
+                stats['parsed'] += 1
+            seen[key] = entry
+
+        stats['removed'] = len(self.entries.keys() - seen.keys())
+        self.entries = seen
+        self.version = version
+        return stats
+
+    def events(self):
+        return [entry['event'] for entry in self.entries.values()]
+
+
+class CalendarFeed:
+    """One ICS URL: disk cache + parsed store, safe to refresh from any request thread."""
+
+    def __init__(self, url, cache_dir):
+        self.cache = FeedCache(url, cache_dir)
+        self.store = EventStore()
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """Conditional fetch, then incremental re-parse. Returns (events, stats)."""
+        with self.lock:
+            chunks, version, status = self.cache.fetch()
+            if version == self.store.version:
+                chunks.close()  # unchanged feed → not even read back from disk
+            stats = self.store.sync(chunks, version)
+            stats['feed'] = status
+            return self.store.events(), stats
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def get_feed(url, cache_dir):
+    """The process-wide CalendarFeed for a URL — the parsed store outlives the request."""
+    with _feeds_lock:
+        feed = _feeds.get(url)
+        if feed is None:
+            feed = _feeds[url] = CalendarFeed(url, cache_dir)
+        return feed
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# INSTANCES FOR A DATE RANGE
+# ──────────────────────────────────────────────────────────────────────────────
+def instances_between(all_events, start_date, end_date, logger=None):
+    """
+    Every event instance (one-offs, overrides, RRULE expansions) whose start
+    falls on a day in [start_date, end_date], Central time. Recurring series
+    come from the compiled, cached rulesets in recurrence.py.
+    """
+    # RECURRENCE-ID overrides replace the generated instance for that day
+    exceptions = {}
+    for e in all_events:
+        if e["RECURRENCE-ID"]:
+            exceptions.setdefault(e["UID"], set()).add(to_date(e["RECURRENCE-ID"]))
+
+    window_start = datetime.combine(start_date, datetime.min.time())
+    window_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+
+    found = []
+    for e in all_events:
+        start = e["DTSTART"]
+        if not start:
+            continue
+
+        if e["RECURRENCE-ID"] or not e["RRULE"]:
+            if start_date <= to_date(start) <= end_date:
+                # An override shares its key with the occurrence it replaces
+                found.append(dict(e, INSTANCE=instance_key(e["RECURRENCE-ID"])))
+            continue
+
+        try:
+            series = compile_series(e["UID"], e["RRULE"], start, tuple(e["EXDATE"]))
+            overridden = exceptions.get(e["UID"], ())
+            # Same length for every occurrence — not the first occurrence's DTEND
+            duration = None
+            if isinstance(start, datetime):
+                duration = compute_end(start, e["DTEND"], e["DURATION"]) - start
+
+            for wall_start in series.between(window_start, window_end):
+                if wall_start.date() in overridden:
+                    continue
+                # Same wall time, with the real (DST-aware) offset for that date
+                inst_start = CENTRAL.localize(wall_start)
+                new_e = e.copy()
+                new_e["INSTANCE"] = instance_key(inst_start)
+                new_e["DTSTART"] = inst_start
+                new_e["DTEND"] = inst_start + duration if duration is not None else None
+                found.append(new_e)
+
+        except Exception as ex:
+            if logger:
+                logger.warning(f"RRULE FAILED → {e.get('SUMMARY', 'Unknown')}: {ex}")
+    return found
+
+
+def instances_on(all_events, target_date, logger=None):
+    """Every event instance on one day."""
+    return instances_between(all_events, target_date, target_date, logger)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# SAVE — UPSERT ON (source_uid, source_instance)
+# ──────────────────────────────────────────────────────────────────────────────
+_SYNCED_FIELDS = ('title', 'start_date', 'end_date', 'start_time', 'end_time')
+
+
+def _event_row(ev):
+    start = ev["DTSTART"]
+    return {
+        'source_uid': ev["UID"],
+        'source_instance': ev["INSTANCE"],
+        'title': (ev["SUMMARY"] or "No Title")[:100],
+        'start_date': start.date(),
+        'end_date': start.date(),
+        'start_time': start.time(),
+        'end_time': ev["DTEND"].time() if ev["DTEND"] else None,
+    }
+
+
+def save_instances(instances, start_date, end_date):
+    """
+    Make the imported events for [start_date, end_date] match the feed:
+    bulk INSERT new occurrences, bulk UPDATE changed ones, DELETE the ones
+    the feed dropped. Re-running an unchanged import writes nothing.
+    Caller commits. Returns {'inserted', 'updated', 'deleted', 'unchanged'}.
+    """
+    wanted = {}
+    for ev in instances:
+        if ev["AllDay"] or not ev["UID"]:
+            continue  # Skip all-day; no UID → nothing to dedup on
+        row = _event_row(ev)
+        wanted[(row['source_uid'], row['source_instance'])] = row
+
+    columns = (Event.id, Event.source_uid, Event.source_instance) + tuple(
+        getattr(Event, f) for f in _SYNCED_FIELDS
+    )
+    existing = {
+        (r.source_uid, r.source_instance): r
+        for r in db.session.query(*columns).filter(
+            Event.source_uid.isnot(None),
+            Event.start_date >= start_date,
+            Event.start_date <= end_date,
+        )
+    }
+    # Occurrences moved into the window from outside it — only look up the keys still unknown
+    unknown = [key for key in wanted if key not in existing]
+    for i in range(0, len(unknown), KEY_LOOKUP_CHUNK):
+        chunk = unknown[i:i + KEY_LOOKUP_CHUNK]
+        for r in db.session.query(*columns).filter(
+            tuple_(Event.source_uid, Event.source_instance).in_(chunk)
+        ):
+            existing[(r.source_uid, r.source_instance)] = r
+
+    inserts, updates = [], []
+    for key, row in wanted.items():
+        current = existing.get(key)
+        if current is None:
+            inserts.append(row)
+        elif any(getattr(current, f) != row[f] for f in _SYNCED_FIELDS):
+            updates.append(dict(row, id=current.id))
+
+    gone = [
+        r.id for key, r in existing.items()
+        if key not in wanted and start_date <= r.start_date <= end_date
+    ]
+
+    if inserts:
+        db.session.execute(insert(Event), inserts)
+    if updates:
+        db.session.execute(update(Event), updates)
+    if gone:
+        db.session.execute(
+            delete(Event).where(Event.id.in_(gone)),
+            execution_options={'synchronize_session': False}
+        )
+        record_tombstones('event', gone)
+
+    return {
+        'inserted': len(inserts),
+        'updated': len(updates),
+        'deleted': len(gone),
+        'unchanged': len(wanted) - len(inserts) - len(updates),
+    }
@@ -0,0 +1,176 @@
+# app/events.py
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import and_, event as sa_event, or_
+from . import db
+from .models import Event
+from .recurrence import compile_series
+
+# Event.recurrence_rule as stored by the event modal → RRULE. Anything
+# already starting with FREQ= is used as is.
+RECURRENCE_RULES = {
+    'daily': 'FREQ=DAILY',
+    'weekly': 'FREQ=WEEKLY',
+    'monthly': 'FREQ=MONTHLY',
+}
+
+WINDOW_CACHE_SIZE = 64   # month + week + day views for a few months back and forth
+
+# (start, end, series signature) → {series id: [occurrence start dates]}
+_window_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_generation = 0
+
+
+def invalidate_event_cache():
+    """Drop every cached expansion — called whenever an Event row is written."""
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        _window_cache.clear()
+
+
+@sa_event.listens_for(db.session, 'after_flush')
+def _events_flushed(session, flush_context):
+    if any(isinstance(obj, Event) for obj in (*session.new, *session.dirty, *session.deleted)):
+        invalidate_event_cache()
+
+
+@sa_event.listens_for(db.session, 'do_orm_execute')
+def _events_bulk_written(orm_execute_state):
+    # Bulk insert()/update()/delete() on Event skip the flush — catch them here
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(m.class_ is Event for m in orm_execute_state.all_mappers):
+        invalidate_event_cache()
+
+
+def series_rrule(event):
+    """The RRULE for a recurring Event row, or None if it doesn't really recur."""
+    if not event.is_recurring or not event.recurrence_rule:
+        return None
+    rule = event.recurrence_rule.strip()
+    if rule.upper().startswith('FREQ='):
+        return rule
+    return RECURRENCE_RULES.get(rule.lower())
+
+
+def _expand_series(series, start, end):
+    """{series id: [occurrence start dates]} for occurrences that touch [start, end]."""
+    expanded = {}
+    for event in series:
+        rrule = series_rrule(event)
+        span = (event.end_date - event.start_date).days
+        try:
+            occurrences = compile_series(
+                f"event:{event.id}", rrule, event.start_date
+            ).between(
+                # Reach back far enough to catch multi-day occurrences already running
+                datetime.combine(start - timedelta(days=span), time.min),
+                datetime.combine(end + timedelta(days=1), time.min),
+            )
+        except ValueError:
+            occurrences = [datetime.combine(event.start_date, time.min)]  # bad rule → first one only
+        expanded[event.id] = [o.date() for o in occurrences]
+    return expanded
+
+
+def _window_occurrences(series, start, end):
+    """
+    _expand_series() through the per-window cache. The key carries each series'
+    rule/dates/updated_at too, so an edit made by another worker process (which
+    this one's flush hooks never see) still misses the cache.
+    """
+    key = (start, end, tuple(
+        (e.id, e.recurrence_rule, e.start_date, e.end_date, e.updated_at) for e in series
+    ))
+    with _cache_lock:
+        generation = _generation
+        cached = _window_cache.get(key)
+        if cached is not None:
+            _window_cache.move_to_end(key)
+            return cached
+
+    expanded = _expand_series(series, start, end)
+
+    with _cache_lock:
+        if generation == _generation:   # nobody wrote an Event while we were expanding
+            _window_cache[key] = expanded
+            while len(_window_cache) > WINDOW_CACHE_SIZE:
+                _window_cache.popitem(last=False)
+    return expanded
+
+
+def _bucket_order(event):
+    return (not event.all_day, event.start_time or time.min)
+
+
+class EventWindow:
+    """
+    All events overlapping [start, end], loaded with ONE query and bucketed by day.
+    Multi-day events land in every day they span (clipped to the window).
+    Recurring events (one row per series) are projected onto every day they
+    occur — the expansion is cached per window until an Event is written.
+    Buckets keep the query order: all_day desc, start_time asc.
+    """
+
+    def __init__(self, start: date, end: date):
+        self.start = start
+        self.end = end
+        self._by_day = defaultdict(list)
+
+        events = Event.query.filter(or_(
+            and_(Event.start_date <= end, Event.end_date >= start),
+            # A series that started before the window can still occur inside it
+            and_(Event.is_recurring == True, Event.recurrence_rule.isnot(None), Event.start_date <= end),
+        )).order_by(
+            Event.all_day.desc(),
+            Event.start_time.asc()
+        ).all()
+
+        series = [e for e in events if series_rrule(e)]
+        for event in events:
+            if not series_rrule(event):
+                self._add(event, event.start_date, event.end_date)
+
+        if series:
+            occurrences = _window_occurrences(series, start, end)
+            touched = set()
+            for event in series:
+                span = event.end_date - event.start_date
+                for first_day in occurrences.get(event.id, ()):
+                    touched.update(self._add(event, first_day, first_day + span))
+            for d in touched:
+                self._by_day[d].sort(key=_bucket_order)
+
+    def _add(self, event, first_day, last_day):
+        d = max(first_day, self.start)
+        last = min(last_day, self.end)
+        days = []
+        while d <= last:
+            self._by_day[d].append(event)
+            days.append(d)
+            d += timedelta(days=1)
+        return days
+
+    def on(self, d: date) -> list:
+        """Events on a single day — O(1), no SQL."""
+        return self._by_day.get(d, [])
+
+    def events_on_date(self, y: int, m: int, d: int) -> list:
+        """Drop-in replacement for the old per-cell events_on_date(y, m, d) helper."""
+        return self.on(date(y, m, d))
+
+    def split_on(self, d: date) -> tuple:
+        """
+        (all_day, timed) for one day.
+        Timed events are sorted by start then end time for the hourly grid.
+        """
+        events = self.on(d)
+        all_day = [e for e in events if e.all_day]
+        timed = sorted(
+            (e for e in events if e.start_time and not e.all_day),
+            key=lambda e: (e.start_time, e.end_time or e.start_time)
+        )
+        return all_day, timed
@@ -0,0 +1,208 @@
+# app/goal_tree.py
+from collections import defaultdict
+import click
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+from flask.cli import with_appcontext
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+from . import db
+from .models import Goal
+from .transfer import record_tombstones
+
+
+def compute_progress(rows):
+    """
+    Roll-up progress for every goal in ONE bottom-up pass — O(N).
+    rows: iterable of (id, parent_id, completed).
+    Same rule as the old recursive Goal.progress():
+      leaf     → 100 if completed else 0
+      non-leaf → % of children that are themselves at 100
+    """
+    completed = {}
+    children = defaultdict(list)
+    for goal_id, parent_id, is_done in rows:
+        completed[goal_id] = bool(is_done)
+        if parent_id is not None:
+            children[parent_id].append(goal_id)
+
+    progress = {}
+    for root in completed:
+        if root in progress:
+            continue
+        # Iterative post-order: children are finished before their parent
+        stack = [(root, False)]
+        visiting = set()
+        while stack:
+            goal_id, expanded = stack.pop()
+            if goal_id in progress:
+                continue
+            kids = children.get(goal_id, ())
+            if not kids:
+                progress[goal_id] = 100 if completed[goal_id] else 0
+            elif expanded:
+                done = sum(1 for k in kids if progress.get(k) == 100)
+                progress[goal_id] = int((done / len(kids)) * 100)
+            elif goal_id not in visiting:  # a bad parent_id cycle can't loop forever
+                visiting.add(goal_id)
+                stack.append((goal_id, True))
+                stack.extend((k, False) for k in kids if k not in progress)
+    return progress
+
+
+def goal_progress_map():
+    """{goal_id: progress %} for the whole forest — ONE flat SELECT, no lazy loads."""
+    rows = db.session.query(Goal.id, Goal.parent_id, Goal.completed).all()
+    return compute_progress(rows)
+
+
+def goal_period(goal_type, due):
+    """(first, last) day of the page a goal of this type due on `due` shows on, or None."""
+    if due is None:
+        return None
+    if goal_type == 'annual':
+        return date(due.year, 1, 1), date(due.year, 12, 31)
+    if goal_type == 'quarterly':
+        first = date(due.year, (due.month - 1) // 3 * 3 + 1, 1)
+        return first, first + relativedelta(months=3) - timedelta(days=1)
+    if goal_type == 'monthly':
+        first = due.replace(day=1)
+        return first, first + relativedelta(months=1) - timedelta(days=1)
+    if goal_type == 'weekly':
+        sunday = due - timedelta(days=(due.weekday() + 1) % 7)   # weeks start on Sunday
+        return sunday, sunday + timedelta(days=6)
+    if goal_type == 'daily':
+        return due, due
+    return None
+
+
+def goal_column(goal, neighbour=None):
+    """
+    Conditions covering the Kanban column `goal` shows in — what a rerank may
+    rewrite: same status, same type, same period. Year and week pages list
+    undated goals in every period, so those columns include the undated ones;
+    an undated card borrows its neighbour's period, else the whole type.
+    """
+    conditions = [Goal.status == (goal.status or 'todo'), Goal.type == goal.type]
+    undated_everywhere = goal.type in ('annual', 'weekly')
+    due = goal.due_date
+    if due is None and undated_everywhere and neighbour is not None:
+        due = neighbour.due_date
+    period = goal_period(goal.type, due)
+    if period is not None:
+        in_period = Goal.due_date.between(*period)
+        conditions.append(or_(in_period, Goal.due_date.is_(None)) if undated_everywhere else in_period)
+    elif goal.due_date is None and not undated_everywhere:
+        conditions.append(Goal.due_date.is_(None))
+    return tuple(conditions)
+
+
+def _root_sort_key(goal):
+    # Undated goals first, then by due date
+    return (goal.due_date is not None, goal.due_date or date.min, goal.rank or 0, goal.id)
+
+
+def _child_sort_key(goal):
+    # Dated goals first, undated last
+    return (goal.due_date or date.max, goal.rank or 0, goal.id)
+
+
+def load_goal_forest():
+    """
+    Every goal in ONE SELECT, with .children / .parent wired up in memory
+    (committed, so touching them never lazy-loads). Returns (roots, goals_by_id).
+    """
+    goals = Goal.query.all()
+    by_id = {g.id: g for g in goals}
+    children = defaultdict(list)
+    roots = []
+    for g in goals:
+        if g.parent_id is None:
+            roots.append(g)
+        elif g.parent_id in by_id:
+            children[g.parent_id].append(g)
+
+    for g in goals:
+        set_committed_value(g, 'children', sorted(children.get(g.id, []), key=_child_sort_key))
+        set_committed_value(g, 'parent', by_id.get(g.parent_id))
+
+    roots.sort(key=_root_sort_key)
+    return roots, by_id
+
+
+def delete_goal_subtree(goal_id):
+    """
+    Delete a goal and every descendant with ONE recursive-CTE DELETE —
+    no rows loaded into the session. Returns the number of rows removed.
+    """
+    subtree = select(Goal.id).where(Goal.id == goal_id).cte('subtree', recursive=True)
+    subtree = subtree.union_all(
+        select(Goal.id).where(Goal.parent_id == subtree.c.id)
+    )
+    # RETURNING rather than rowcount: Python's sqlite3 reports -1 for WITH ... DELETE
+    result = db.session.execute(
+        delete(Goal).where(Goal.id.in_(select(subtree.c.id))).returning(Goal.id),
+        execution_options={'synchronize_session': False}
+    )
+    deleted_ids = result.scalars().all()
+    record_tombstones('goal', deleted_ids)
+    return len(deleted_ids)
+
+
+def place_goal(goal):
+    """
+    Set depth/path on a goal that has just been flushed (so it has an id),
+    from its parent's stored values — no ancestor walk.
+    """
+    parent = db.session.get(Goal, goal.parent_id) if goal.parent_id else None
+    if parent is not None and parent.path is None:
+        # Parent predates the backfill — fix the whole forest once
+        rebuild_goal_paths()
+        db.session.refresh(parent)
+    goal.depth = parent.depth + 1 if parent else 0
+    goal.path = f"{parent.path if parent else '/'}{goal.id}/"
+
+
+def rebuild_goal_paths():
+    """
+    Recompute depth/path for every goal: one flat SELECT, a walk down from
+    the roots in memory, then one bulk UPDATE of the rows that changed.
+    Returns that count.
+    """
+    rows = db.session.query(Goal.id, Goal.parent_id, Goal.depth, Goal.path).all()
+    ids = {r.id for r in rows}
+    children = defaultdict(list)
+    roots = []
+    for r in rows:
+        if r.parent_id is None or r.parent_id not in ids:
+            roots.append(r.id)
+        else:
+            children[r.parent_id].append(r.id)
+
+    placed = {root: (0, f"/{root}/") for root in roots}
+    queue = list(roots)
+    while queue:
+        goal_id = queue.pop()
+        depth, path = placed[goal_id]
+        for child in children.get(goal_id, ()):
+            if child not in placed:
+                placed[child] = (depth + 1, f"{path}{child}/")
+                queue.append(child)
+
+    updates = [
+        {'id': r.id, 'depth': placed[r.id][0], 'path': placed[r.id][1]}
+        for r in rows
+        if r.id in placed and (r.depth, r.path) != placed[r.id]
+    ]
+    if updates:
+        db.session.execute(update(Goal), updates)
+    return len(updates)
+
+
+@click.command('backfill-goal-paths')
+@with_appcontext
+def backfill_goal_paths_command():
+    """Fill Goal.depth / Goal.path for existing rows (run after `flask db upgrade`)."""
+    changed = rebuild_goal_paths()
+    db.session.commit()
+    click.echo(f"Goal hierarchy backfilled: {changed} rows updated.")
@@ -0,0 +1,140 @@
+# app/ics_tokenizer.py
+# Streaming iCalendar (RFC 5545) tokenizer. Reads any iterable of text or bytes
+# chunks (response.iter_content(), an open file, a list of strings) and never
+# holds more than the current line and the current VEVENT — memory stays flat
+# however big the feed is.
+import codecs
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+def iter_file_chunks(fp, size=READ_CHUNK_BYTES):
+    """Chunks from an open file, text or binary."""
+    while True:
+        chunk = fp.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _decoded(chunks):
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    for chunk in chunks:
+        yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+    yield decoder.decode(b'', final=True)
+
+
+def iter_unfolded_lines(chunks):
+    """
+    Logical content lines, unfolded (CRLF/LF + space or tab continues the
+    previous line). Each chunk is split in one go; continuation pieces are
+    collected in a list and joined once, not concatenated piece by piece.
+    """
+    pending = ''      # text after the last newline seen
+    current = None    # pieces of the logical line being built
+    for text in _decoded(chunks):
+        if not text:
+            continue
+        lines = (pending + text).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            if line[:1] in (' ', '\t'):
+                if current is not None:
+                    current.append(line[1:].rstrip('\r'))
+                continue
+            if current is not None:
+                yield ''.join(current).rstrip()
+            current = [line.rstrip('\r')]
+
+    if pending[:1] in (' ', '\t'):
+        if current is not None:
+            current.append(pending[1:])
+    else:
+        if current is not None:
+            yield ''.join(current).rstrip()
+        current = [pending] if pending else None
+    if current is not None:
+        yield ''.join(current).rstrip()
+
+
+def split_property(line):
+    """
+    'DTSTART;TZID="Central Standard Time":20260105T090000'
+        → ('DTSTART', {'TZID': 'Central Standard Time'}, '20260105T090000')
+    A single left-to-right scan; quoted parameter values may hold ':' and ';'.
+    Returns None for a line without a value.
+    """
+    colon = line.find(':')
+    if colon < 0:
+        return None
+    head = line[:colon]
+    if '"' not in head:
+        # Fast path — no quoting, so plain splits are exact
+        name, _, rest = head.partition(';')
+        params = {}
+        if rest:
+            for param in rest.split(';'):
+                key, eq, value = param.partition('=')
+                if not eq:
+                    return None
+                params[key.upper()] = value
+        return name.upper(), params, line[colon + 1:]
+
+    params = {}
+    i = 0
+    n = len(line)
+    # name
+    while i < n and line[i] not in ';:':
+        i += 1
+    name = line[:i].upper()
+    # ;param=value[,value]... up to the first unquoted ':'
+    while i < n and line[i] == ';':
+        i += 1
+        eq = line.find('=', i)
+        if eq < 0:
+            return None
+        key = line[i:eq].upper()
+        i = eq + 1
+        if i < n and line[i] == '"':
+            close = line.find('"', i + 1)
+            if close < 0:
+                return None
+            value = line[i + 1:close]
+            i = close + 1
+        else:
+            start = i
+            while i < n and line[i] not in ';:':
+                i += 1
+            value = line[start:i]
+        params[key] = value
+    if i >= n or line[i] != ':':
+        return None
+    return name, params, line[i + 1:]
+
+
+def iter_vevents(chunks):
+    """
+    Yield one dict per VEVENT: {PROPERTY NAME: [(params, value), ...]} in feed
+    order. Nested components (VALARM) are skipped; VTIMEZONE and friends are
+    never materialized.
+    """
+    event = None
+    nested = 0
+    for line in iter_unfolded_lines(chunks):
+        if event is None:
+            if line == 'BEGIN:VEVENT':
+                event = {}
+            continue
+        if line.startswith('BEGIN:'):
+            nested += 1
+        elif line.startswith('END:'):
+            if nested:
+                nested -= 1
+            elif line == 'END:VEVENT':
+                yield event
+                event = None
+        elif not nested:
+            prop = split_property(line)
+            if prop is not None:
+                name, params, value = prop
+                event.setdefault(name, []).append((params, value))
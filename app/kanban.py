@@ -0,0 +1,29 @@
+# app/kanban.py
+from enum import Enum as PyEnum
+
+# Kanban column ids, left to right — Goal.status values and TaskStatus values alike
+KANBAN_COLUMNS = ('todo', 'in_progress', 'blocked', 'done')
+
+
+def status_key(item):
+    """'todo' for both Goal.status == 'todo' and Task.status == TaskStatus.TODO."""
+    status = getattr(item, 'status', None)
+    return status.value if isinstance(status, PyEnum) else status
+
+
+def group_by_status(items, columns=KANBAN_COLUMNS, default='todo'):
+    """
+    {column: [items]} in ONE pass over any iterable — a list, or a query result
+    streaming straight off the cursor. Items keep their incoming (rank) order
+    inside each column. Unknown statuses go to `default`, or are dropped when
+    default is None.
+    """
+    grouped = {column: [] for column in columns}
+    for item in items:
+        bucket = grouped.get(status_key(item))
+        if bucket is None:
+            if default is None:
+                continue
+            bucket = grouped[default]
+        bucket.append(item)
+    return grouped
@@ -28,8 +28,14 @@ class ExportableMixin:
 
         return result
 
+# Change tracking for delta export/import (see transfer.py)
+class SyncMixin:
+    """Stamps every insert/update so /export-json?since=... can find changed rows."""
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+
 # app/models.py
-class Note(ExportableMixin, db.Model):
+class Note(SyncMixin, ExportableMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     scope = db.Column(db.String(20), nullable=False, index=True)
     year = db.Column(db.Integer, nullable=False, index=True)
@@ -43,10 +49,11 @@ class Note(ExportableMixin, db.Model):
     content = db.Column(db.Text, nullable=True)
     completed = db.Column(db.Boolean, default=False)
     __table_args__ = (
+        # Also THE lookup index: note-key reads match all nine columns, page loads the period prefix
         db.UniqueConstraint('scope', 'year', 'quarter', 'month', 'week', 'day', 'time', 'index', 'type', name='uix_note'),
     )
 
-class Goal(ExportableMixin, db.Model):
+class Goal(SyncMixin, ExportableMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     type = db.Column(db.String(20), default='annual')  # e.g., Annual, Q1, Jan, etc.
@@ -59,6 +66,14 @@ class Goal(ExportableMixin, db.Model):
     status = db.Column(db.String(20), default='todo', nullable=False, server_default='todo')  # 'todo', 'in_progress', 'blocked', 'done'
     category = db.Column(db.String(20))
     rank = db.Column(db.Integer, default=0, nullable=False, server_default="0", index=True)
+    # Materialized hierarchy — maintained by goal_tree.place_goal / rebuild_goal_paths
+    depth = db.Column(db.Integer, default=0, nullable=False, server_default="0", index=True)
+    path = db.Column(db.String(255))  # "/<root id>/.../<own id>/"
+
+    __table_args__ = (
+        # Prefix LIKE '/1/5/%' must use the index on Postgres too
+        db.Index('ix_goal_path', 'path', postgresql_ops={'path': 'varchar_pattern_ops'}),
+    )
 
     # Self-referencing relationship
     children = db.relationship(
@@ -68,25 +83,24 @@ class Goal(ExportableMixin, db.Model):
         cascade='all, delete-orphan'
     )
 
-    def progress(self):
-        """Roll-up progress from children"""
-        if not self.children:
-            return 100 if self.completed else 0
-        total = len(self.children)
-        completed = sum(1 for c in self.children if c.progress() == 100)
-        return int((completed / total) * 100) if total else 0
+    def progress(self, progress_map):
+        """Roll-up progress from children, read from goal_tree.goal_progress_map() — build the map ONCE per request, not per goal"""
+        return progress_map.get(self.id, 100 if self.completed else 0)
 
     def level(self):
-        """Determine hierarchy level"""
-        if not self.parent:
-            return 'annual'
-        depth = 0
-        p = self.parent
-        while p:
-            depth += 1
-            p = p.parent
+        """Determine hierarchy level — O(1) from the stored depth"""
         levels = ['annual', 'quarter', 'month', 'week', 'day']
-        return levels[min(depth, len(levels) - 1)]
+        return levels[min(self.depth or 0, len(levels) - 1)]
+
+    def ancestor_ids(self):
+        """Root → parent ids, straight from the materialized path"""
+        if not self.path:
+            return []
+        return [int(p) for p in self.path.strip('/').split('/')[:-1]]
+
+    def descendants_query(self):
+        """Every goal below this one — one indexed prefix scan on path"""
+        return Goal.query.filter(Goal.path.like(f"{self.path}%"), Goal.id != self.id)
 
     def __repr__(self):
         return f"<Goal {self.id}: {self.title} [{self.level()}]>"
@@ -106,7 +120,7 @@ class Goal(ExportableMixin, db.Model):
         }
 
 
-class Event(ExportableMixin, db.Model):
+class Event(SyncMixin, ExportableMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
@@ -116,6 +130,15 @@ class Event(ExportableMixin, db.Model):
     is_recurring = db.Column(db.Boolean, default=False)
     recurrence_rule = db.Column(db.String(50))  # 'daily', 'weekly', 'monthly'
     all_day = db.Column(db.Boolean, default=False)
+    # Calendar imports: feed UID + which occurrence ('' for a one-off, else its
+    # original start as YYYYMMDDTHHMMSS). NULL for events made in the app.
+    source_uid = db.Column(db.String(255))
+    source_instance = db.Column(db.String(32))
+
+    __table_args__ = (
+        # Re-importing upserts on this instead of adding duplicates
+        db.UniqueConstraint('source_uid', 'source_instance', name='uix_event_source'),
+    )
 
     def __repr__(self):
         return f"<Event {self.title}>"
@@ -129,7 +152,7 @@ class TaskStatus(PyEnum):
     BACKLOG = "backlog"
 
 
-class Task(ExportableMixin, db.Model):
+class Task(SyncMixin, ExportableMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(200), nullable=False)
     date = db.Column(db.Date, nullable=True)
@@ -137,3 +160,16 @@ class Task(ExportableMixin, db.Model):
     notes = db.Column(db.Text, nullable=True)
     rank = db.Column(db.Integer, default=0, nullable=False, server_default="0", index=True)
     category = db.Column(db.String(50), nullable=True, index=True)
+
+    __table_args__ = (
+        # Day board: status first so years of DONE rows are never scanned (see tasks.py)
+        db.Index('ix_task_status_date_rank', 'status', 'date', 'rank'),
+    )
+
+
+class Tombstone(ExportableMixin, db.Model):
+    """A deleted row — lets a delta export replay the delete on another database."""
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(20), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,181 @@
+# app/notes.py
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from sqlalchemy import and_, or_, insert, update
+from . import db
+from .models import Note
+
+# Period columns that identify a note's window, in key order
+WINDOW_FIELDS = ('year', 'quarter', 'month', 'week', 'day')
+
+# Every column in the uix_note unique constraint
+KEY_FIELDS = ('scope', 'year', 'quarter', 'month', 'week', 'day', 'time', 'index', 'type')
+
+
+# Period parts that follow <year> in a key, per scope
+SCOPE_PARTS = {
+    'year': (),
+    'quarter': ('quarter',),
+    'month': ('month',),
+    'week': ('week',),
+    'day': ('month', 'day'),
+}
+
+PART_RANGES = {
+    'quarter': (1, 4),
+    'month': (1, 12),
+    'week': (1, 53),
+    'day': (1, 31),
+}
+
+
+def _compile_key_pattern(scope, parts):
+    periods = ''.join(rf'-(?P<{p}>\d{{1,2}})' for p in parts)
+    # Only day notes carry an hourly slot / task index after the type
+    suffix = r'(?:-(?P<time>\d{2}:\d{2}))?(?:-(?P<index>\d+))?' if scope == 'day' else ''
+    return re.compile(
+        rf'^note-{scope}-(?P<year>\d{{4}}){periods}-(?P<type>[A-Za-z][A-Za-z0-9_]*){suffix}$'
+    )
+
+
+# Compiled ONCE at import — one pattern per scope
+_KEY_PATTERNS = {scope: _compile_key_pattern(scope, parts) for scope, parts in SCOPE_PARTS.items()}
+
+
+class NoteAddress(NamedTuple):
+    """A parsed note key — one value per uix_note column, None where unused."""
+    scope: str
+    year: int
+    quarter: Optional[int]
+    month: Optional[int]
+    week: Optional[int]
+    day: Optional[int]
+    time: Optional[str]
+    index: Optional[int]
+    type: str
+
+
+@lru_cache(maxsize=4096)
+def parse_note_key(key):
+    """
+    Parse and validate 'note-<scope>-<year>[-periods]-<type>[-HH:MM][-index]'.
+    Returns a NoteAddress, or None for a malformed key. Cached: the same
+    handful of keys per page are parsed over and over.
+    """
+    _, _, rest = key.partition('-')
+    scope = rest.partition('-')[0]
+    pattern = _KEY_PATTERNS.get(scope)
+    if pattern is None:
+        return None
+    match = pattern.match(key)
+    if match is None:
+        return None
+
+    fields = match.groupdict()
+    values = {}
+    for f in ('year', 'quarter', 'month', 'week', 'day', 'index'):
+        if fields.get(f) is not None:
+            values[f] = int(fields[f])
+            low, high = PART_RANGES.get(f, (0, None))
+            if values[f] < low or (high is not None and values[f] > high):
+                return None
+
+    time = fields.get('time')
+    if time is not None and (int(time[:2]) > 23 or int(time[3:]) > 59):
+        return None
+
+    return NoteAddress(
+        scope=scope,
+        year=values['year'],
+        quarter=values.get('quarter'),
+        month=values.get('month'),
+        week=values.get('week'),
+        day=values.get('day'),
+        time=time,
+        index=values.get('index'),
+        type=fields['type'],
+    )
+
+
+def address_filter(address):
+    """Exact match on every uix_note column — missing parts must be NULL."""
+    return and_(*[
+        getattr(Note, f) == v if v is not None else getattr(Note, f).is_(None)
+        for f, v in zip(KEY_FIELDS, address)
+    ])
+
+
+def note_key(note):
+    """
+    Build the client-side key for a note — mirrors the key logic in autosave.js:
+    note-<scope>-<year>[-quarter][-month][-week][-day]-<type>[-time][-index]
+    """
+    parts = ['note', note.scope]
+    for field in WINDOW_FIELDS:
+        value = getattr(note, field)
+        if value is not None:
+            parts.append(str(value))
+    parts.append(note.type)
+    if note.time is not None:
+        parts.append(note.time)
+    if note.index is not None:
+        parts.append(str(note.index))
+    return '-'.join(parts)
+
+
+def notes_in_window(scope, **window):
+    """
+    Every note for one scope/window (e.g. scope='day', year=2026, month=10, day=18)
+    in ONE query, as {key: {'content': ..., 'completed': ...}}.
+    """
+    filters = {k: v for k, v in window.items() if k in WINDOW_FIELDS and v is not None}
+    notes = Note.query.filter_by(scope=scope, **filters).all()
+    return {
+        note_key(note): {
+            'content': note.content or '',
+            'completed': bool(note.completed)
+        }
+        for note in notes
+    }
+
+
+def save_notes(values):
+    """
+    Upsert many notes in ONE transaction: {key: {'content': ..., 'completed': ...}}.
+    One SELECT finds the existing rows, then one bulk INSERT + one bulk UPDATE.
+    Raises ValueError on a malformed key. Caller commits.
+
+    Not INSERT ... ON CONFLICT: every uix_note column except scope/year/type is
+    nullable, and NULLs never collide in a unique constraint (SQLite or Postgres),
+    so the conflict clause would silently insert duplicates.
+    """
+    rows = {}
+    for key, value in values.items():
+        address = parse_note_key(key)
+        if address is None:
+            raise ValueError(f"Invalid note key: {key}")
+        rows[address] = {
+            **address._asdict(),
+            'content': value.get('content', ''),
+            'completed': bool(value.get('completed', False)),
+        }
+
+    # ONE SELECT for every addressed note
+    existing = {}
+    if rows:
+        for note in Note.query.filter(or_(*[address_filter(a) for a in rows])).all():
+            existing[NoteAddress(*(getattr(note, f) for f in KEY_FIELDS))] = note.id
+
+    inserts = [row for key, row in rows.items() if key not in existing]
+    updates = [
+        {'id': existing[key], 'content': row['content'], 'completed': row['completed']}
+        for key, row in rows.items() if key in existing
+    ]
+
+    if inserts:
+        db.session.execute(insert(Note), inserts)
+    if updates:
+        db.session.execute(update(Note), updates)
+
+    return len(rows)
@@ -0,0 +1,69 @@
+# app/ranking.py
+from sqlalchemy import and_, func, or_, select, update
+from . import db
+
+# Ranks are spaced this far apart, so ~10 drops into the same slot fit before
+# anything else has to move
+RANK_GAP = 1024
+
+
+class RankError(ValueError):
+    """The neighbours sent with a move don't exist or aren't in order (stale board)."""
+
+
+def next_rank(model, column):
+    """Rank for a new card at the bottom of its column: max(rank) + RANK_GAP."""
+    top = db.session.execute(select(func.max(model.rank)).where(*column)).scalar()
+    return RANK_GAP if top is None else top + RANK_GAP
+
+
+def move_between(model, item, prev_id=None, next_id=None, *, column):
+    """
+    Put `item` (a Task or Goal) between prev (the card above it) and next (the
+    card below it). Only item.rank changes — unless prev and next have no gap
+    left, in which case next and everything after it in next's board column
+    is pushed down by RANK_GAP in ONE set-based UPDATE first.
+    column(row, neighbour) → SQL conditions covering every card in that row's
+    board column (tasks.task_column / goal_tree.goal_column). Shifting a whole suffix of the
+    (rank, id) order of a superset of the column keeps the column's order, and
+    rows outside it are never rewritten.
+    Returns True when that rebalance ran. The caller commits.
+    """
+    ids = [i for i in (prev_id, next_id) if i is not None]
+    if item.id in ids:
+        raise RankError("A card can't be its own neighbour")
+    rows = {}
+    if ids:
+        rows = {row.id: row for row in db.session.execute(
+            select(model).where(model.id.in_(ids))
+        ).scalars()}
+    if len(rows) != len(ids):
+        raise RankError('Neighbour not found')
+
+    prev, nxt = rows.get(prev_id), rows.get(next_id)
+    if prev is None and nxt is None:
+        return False                                  # alone in the column
+    if nxt is None:
+        item.rank = prev.rank + RANK_GAP              # dropped at the bottom
+        return False
+    if prev is None:
+        item.rank = nxt.rank - RANK_GAP               # dropped at the top
+        return False
+    if (prev.rank, prev.id) >= (nxt.rank, nxt.id):
+        raise RankError('Neighbours out of order')
+
+    low, high = prev.rank, nxt.rank
+    rebalanced = high - low < 2
+    if rebalanced:
+        db.session.execute(
+            update(model)
+            .where(
+                *column(nxt, prev),
+                model.id != item.id,
+                or_(model.rank > nxt.rank, and_(model.rank == nxt.rank, model.id >= nxt.id)),
+            )
+            .values(rank=model.rank + RANK_GAP)
+        )
+        high += RANK_GAP
+    item.rank = (low + high) // 2
+    return rebalanced
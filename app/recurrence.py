@@ -0,0 +1,91 @@
+# app/recurrence.py
+import re
+import threading
+from bisect import bisect_left
+from datetime import date, datetime
+from functools import lru_cache
+from dateutil.rrule import rruleset, rrulestr
+from dateutil.tz import tzutc
+from pytz import timezone
+
+CENTRAL = timezone("America/Chicago")
+
+_UNTIL_RE = re.compile(r'UNTIL=(\d{8}(?:T\d{6})?)Z', re.IGNORECASE)
+
+
+def _local_until(rrule):
+    """
+    UNTIL=...Z → the same instant as a naive Central wall time. The series is
+    expanded in naive wall time, and dateutil refuses a UTC UNTIL on a naive DTSTART.
+    """
+    def to_local(match):
+        value = match.group(1)
+        if len(value) == 8:
+            return f"UNTIL={value}"
+        utc = datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=tzutc())
+        return f"UNTIL={utc.astimezone(CENTRAL):%Y%m%dT%H%M%S}"
+    return _UNTIL_RE.sub(to_local, rrule)
+
+
+def wall_time(value):
+    """date / aware datetime → naive datetime on the Central wall clock."""
+    if not isinstance(value, datetime):
+        return datetime.combine(value, datetime.min.time())
+    if value.tzinfo is not None:
+        value = value.astimezone(CENTRAL).replace(tzinfo=None)
+    return value
+
+
+class CompiledSeries:
+    """
+    One recurring series: the rruleset is built ONCE (EXDATEs folded in) and
+    occurrences are materialized into a sorted list only as far as anyone has
+    asked — each between() is a bisect over that list, not a walk from DTSTART.
+    """
+
+    def __init__(self, rrule, dtstart, exdates=()):
+        self.dtstart = dtstart
+        self.ruleset = rruleset()
+        self.ruleset.rrule(rrulestr(_local_until(rrule), dtstart=dtstart, ignoretz=True))
+        for ex in exdates:
+            self.ruleset.exdate(ex)
+        self._iter = iter(self.ruleset)
+        self._occurrences = []
+        self._exhausted = False
+        self._lock = threading.Lock()   # cached series are shared across request threads
+
+    def _extend_to(self, end):
+        occurrences = self._occurrences
+        while not self._exhausted and (not occurrences or occurrences[-1] < end):
+            try:
+                occurrences.append(next(self._iter))
+            except StopIteration:
+                self._exhausted = True
+
+    def between(self, start, end):
+        """Occurrence starts (naive wall time) in [start, end)."""
+        with self._lock:
+            self._extend_to(end)
+            occurrences = self._occurrences
+            return occurrences[bisect_left(occurrences, start):bisect_left(occurrences, end)]
+
+
+@lru_cache(maxsize=4096)
+def compile_series(uid, rrule, dtstart, exdates=()):
+    """
+    The cached CompiledSeries for (UID, RRULE, DTSTART, EXDATEs). dtstart and
+    exdates (a tuple) are dates or aware datetimes; date-only EXDATEs drop that
+    day's occurrence at DTSTART's time of day. Raises ValueError on a bad RRULE.
+    """
+    start = wall_time(dtstart)
+    excluded = set()
+    for ex in exdates:
+        if isinstance(ex, datetime):
+            excluded.add(wall_time(ex))
+        elif isinstance(ex, date):
+            excluded.add(datetime.combine(ex, start.time()))
+    return CompiledSeries(rrule, start, sorted(excluded))
+
+
+def clear_cache():
+    compile_series.cache_clear()
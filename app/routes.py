@@ -1,10 +1,22 @@
 # app/routes.py
 from functools import wraps
-from flask import Blueprint, render_template, request, jsonify, abort, url_for, flash, redirect, Response
+from flask import Blueprint, render_template, request, jsonify, abort, url_for, flash, redirect, Response, send_from_directory
 from . import db
 from .models import Goal, Note, Event
 from .models import Task, TaskStatus
 from .forms import GoalForm
+from .events import EventWindow
+from .tasks import MAX_BATCH_OPS, apply_batch, ensure_rolled_over, load_day_board, task_column
+from .kanban import KANBAN_COLUMNS, group_by_status
+from .ranking import RankError, move_between, next_rank
+from .goal_tree import compute_progress, delete_goal_subtree, goal_column, goal_progress_map, load_goal_forest, place_goal
+from .transfer import iter_export_json, gzip_chunks, import_json_stream, record_tombstones
+from .calendar_import import get_feed, instances_between, save_instances
+from .backup import (
+    RestoreError, backup_dir_for, get_job as get_backup_job, list_backups,
+    restore_backup, restore_database, start_backup
+)
+from .notes import WINDOW_FIELDS, parse_note_key, address_filter, notes_in_window, save_notes
 from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta
 from calendar import Calendar, SUNDAY, setfirstweekday
@@ -12,13 +24,11 @@ from sqlalchemy import case
 from sqlalchemy import and_, or_
 import calendar
 from calendar import monthcalendar, month_name
-import shutil
 import os
 from flask import current_app
-import json
+import gzip
 from sqlalchemy import case as db_case
 import re
-import requests
 from datetime import date, datetime, timedelta
 from dateutil.rrule import rrulestr
 from dateutil.tz import tzutc
@@ -38,23 +48,13 @@ def require_auth():
         return ("Unauthorized", 401, {'WWW-Authenticate': 'Basic realm="WFM Planner"'})
 
 
+# DAILY ROLLOVER — registered AFTER require_auth, so only a logged-in request
+# ever writes. A date compare per request, one UPDATE on the first after midnight
+@bp.before_request
+def roll_over_tasks():
+    ensure_rolled_over()
 
 
-# REUSABLE: GROUP GOALS BY STATUS
-def group_goals_by_status(goals):
-    grouped = {
-        'todo': [],
-        'in_progress': [],
-        'blocked': [],
-        'done': []
-    }
-    for goal in goals:
-        status = getattr(goal, 'status', 'todo')
-        if status not in grouped:
-            status = 'todo'
-        grouped[status].append(goal)
-    return grouped
-
 
 @bp.route('/')
 def index():
@@ -104,8 +104,11 @@ def create_goal():
         completed=form.completed.data,
         parent_id=parent_id
     )
+    goal.rank = next_rank(Goal, goal_column(goal))  # bottom of its column, with room to reorder
 
     db.session.add(goal)
+    db.session.flush()  # need the id for the materialized path
+    place_goal(goal)
     db.session.commit()
 
     return jsonify({
@@ -121,35 +124,26 @@ def get_goal(goal_id):
     #print(jsonify(goal.to_dict()))
     return jsonify(goal.to_dict())
 
+# GET: Roll-up progress for every goal — {goal_id: percent}, one query
+@bp.route('/api/goals/progress', methods=['GET'])
+def get_goals_progress():
+    return jsonify({str(k): v for k, v in goal_progress_map().items()})
+
 # GET: Render goals page
 @bp.route('/goals', methods=['GET'])
 def get_goals():
-    # === GET: LOAD TOP-LEVEL GOALS ===
-    goals = Goal.query.filter(
-        Goal.parent_id.is_(None)
-    ).options(
-        db.joinedload(Goal.children)
-    ).order_by(
-        case((Goal.due_date.is_(None), 0), else_=1),
-        Goal.due_date.asc(),
-        Goal.id
-    ).order_by(Goal.rank.asc(), Goal.id.asc()).all()
-
-    # SORT CHILDREN RECURSIVELY
-    def sort_children(goal):
-        if goal.children:
-            goal.children.sort(key=lambda x: (x.due_date or datetime.max.date(), x.id))
-            for child in goal.children:
-                sort_children(child)
-
-    for goal in goals:
-        sort_children(goal)
+    # === GET: WHOLE TREE IN ONE QUERY, CHILDREN SORTED IN MEMORY ===
+    goals, goals_by_id = load_goal_forest()
+    goal_progress = compute_progress(
+        (g.id, g.parent_id, g.completed) for g in goals_by_id.values()
+    )
 
     form = GoalForm()  # For template if needed
 
     return render_template(
         'goals.html',
         goals=goals,
+        goal_progress=goal_progress,
         form=form
     )
 
@@ -198,7 +192,7 @@ def year_page(year):
     prev_year = year - 1
     next_year = year + 1
 
-    annual_goals_grouped = group_goals_by_status(annual_goals)
+    annual_goals_grouped = group_by_status(annual_goals)
     form = GoalForm()
 
     return render_template(
@@ -245,7 +239,7 @@ def quarter_page(year, q_num):
             'url': f"/month/{year}/{m}"
         })
     
-    quarterly_goals_grouped = group_goals_by_status(quarterly_goals)
+    quarterly_goals_grouped = group_by_status(quarterly_goals)
   
     w_start = datetime(year,1,1).date()
     w_end = datetime(year,12,31).date()
@@ -319,7 +313,7 @@ def month_page(year, month):
         iso_week = monday.isocalendar()[1]
         calendar_with_weeks.append((iso_week, week))
 
-    monthly_goals_grouped = group_goals_by_status(monthly_goals)
+    monthly_goals_grouped = group_by_status(monthly_goals)
 
     q_start, q_end = quarter_range(year, month)
     possible_parents = Goal.query.filter(
@@ -331,12 +325,8 @@ def month_page(year, month):
  
     month_name = date(year, month, 1).strftime('%B')
 
-    def events_on_date(y, m, d):
-        d = datetime(y, m, d).date()
-        return Event.query.filter(
-            Event.start_date <= d,
-            Event.end_date >= d
-        ).order_by(Event.all_day.desc(), Event.start_time.asc()).all()
+    # ONE QUERY FOR THE WHOLE MONTH — CELLS LOOK UP THEIR DAY IN MEMORY
+    events = EventWindow(m_start, m_end)
 
     form = GoalForm()
     return render_template(
@@ -353,7 +343,7 @@ def month_page(year, month):
         parent_type='quarterly',
         form=form,
         possible_parents=possible_parents,
-        events_on_date=events_on_date,
+        events_on_date=events.events_on_date,
         calendar_with_weeks=calendar_with_weeks,
         month_name=month_name
     )
@@ -402,7 +392,7 @@ def week_page(year, week):
         Goal.id
     ).order_by(Goal.rank.asc(), Goal.id.asc()).all()
 
-    weekly_goals_grouped = group_goals_by_status(weekly_goals)
+    weekly_goals_grouped = group_by_status(weekly_goals)
     
     
     # BUILD 7-DAY GRID (Sun-Sat)
@@ -449,16 +439,8 @@ def week_page(year, week):
     week_days = [sunday + timedelta(days=i) for i in range(7)]
     #week_days = [first_day + timedelta(days=i) for i in range(7)]
 
-    # DEFINE events_on_date HELPER
-    def events_on_date(year, month, day):
-        date = datetime(year, month, day).date()
-        return Event.query.filter(
-            Event.start_date <= date,
-            Event.end_date >= date
-        ).order_by(
-            Event.all_day.desc(),
-            Event.start_time.asc()
-        ).all()
+    # ONE QUERY FOR THE WHOLE WEEK — CELLS LOOK UP THEIR DAY IN MEMORY
+    events = EventWindow(w_start, w_end)
 
     return render_template(
         'week.html',
@@ -479,7 +461,7 @@ def week_page(year, week):
         form=form,
         possible_parents=possible_parents,
         week_days=week_days,
-        events_on_date=events_on_date,
+        events_on_date=events.events_on_date,
     )
 
 
@@ -506,7 +488,7 @@ def day_page(year, month, day):
     prev_date = day_date - timedelta(days=1)
     next_date = day_date + timedelta(days=1)
 
-    daily_goals_grouped = group_goals_by_status(daily_goals)
+    daily_goals_grouped = group_by_status(daily_goals)
     
     # GET POSSIBLE PARENTS (weekly goals in same week, NOT completed)
     #day_date = datetime(year, month, day).date()
@@ -520,78 +502,14 @@ def day_page(year, month, day):
         Goal.completed == False  # ← EXCLUDE COMPLETED
     ).order_by(Goal.due_date.asc(), Goal.id).all()
 
-    def events_on_date(y, m, d):
-        date = datetime(y, m, d).date()
-        return Event.query.filter(
-            Event.start_date <= date,
-            Event.end_date >= date
-        ).order_by(
-            Event.all_day.desc(),
-            Event.start_time.asc()
-        ).all()
-        
-
-    # 2. Load tasks
-    # TARGET DATE LOGIC
-    is_today = target_date == date.today()
-    is_past = target_date < date.today()
-    is_future = target_date > date.today()
-
-    # BUILD FILTER
-    filters = []
-    #print(target_date)
-    if is_today:
-        #print('is_today')
-        # TODAY: Incomplete (any date) + Completed today
-        filters.append(
-            or_(
-                # All incomplete tasks (any date)
-                Task.status.in_([TaskStatus.IN_PROGRESS, TaskStatus.BLOCKED]),
-                #exclude future todo
-                and_(
-                        Task.status == TaskStatus.TODO,
-                        Task.date <= target_date
-                    ),
-                # Completed TODAY
-                and_(Task.status == TaskStatus.DONE, Task.date == target_date)
-            )
-        )
-    elif is_past:
-        #print('is_past')
-        # PAST: Only completed on THAT day
-        filters.append(
-            and_(Task.status == TaskStatus.DONE, Task.date == target_date)
-        )
-    elif is_future:
-        #print('is_future')
-        # FUTURE: Only tasks with exact date
-        filters.append(Task.date == target_date)
+    # ONE QUERY FOR THE DAY — SPLIT INTO ALL-DAY BANNER + HOURLY GRID
+    all_day_events, timed_events = EventWindow(day_date, day_date).split_on(day_date)
 
-    
-    today_tasks = Task.query.filter(*filters).order_by(
-        case(
-            (Task.status != TaskStatus.DONE, 0),  # Incomplete first
-            else_=1
-        ),
-        Task.id
-    ).order_by(Task.rank.asc(), Task.id.asc()).all()
-
-    # ——— BACKLOG TASKS (date = NULL + not done) ———
-    backlog_tasks = Task.query.filter(
-        #Task.date.is_(None),
-        Task.status == TaskStatus.BACKLOG
-    ).order_by(Task.rank.asc(), Task.id.asc()).all()
-
-    #print(filter)
-    #print(today_tasks)
-
-    # 3. Group for the Kanban board
-    kanban = {
-        'todo':        [t for t in today_tasks if t.status == TaskStatus.TODO],
-        'in_progress': [t for t in today_tasks if t.status == TaskStatus.IN_PROGRESS],
-        'blocked':     [t for t in today_tasks if t.status == TaskStatus.BLOCKED],
-        'done':        [t for t in today_tasks if t.status == TaskStatus.DONE],
-    }
+    # 2. Load tasks — day board + backlog in ONE indexed query (see tasks.py)
+    today_tasks, backlog_tasks = load_day_board(target_date)
+
+    # 3. Group for the Kanban board — one pass, rank order kept
+    kanban = group_by_status(today_tasks, default=None)
 
     form = GoalForm()
     return render_template(
@@ -612,7 +530,8 @@ def day_page(year, month, day):
         #month=month,
         #day=day,
         month_name=calendar.month_name[month],
-        events_on_date=events_on_date,
+        all_day_events=all_day_events,
+        timed_events=timed_events,
         date=target_date,
         kanban=kanban,
         backlog_tasks=backlog_tasks
@@ -624,16 +543,20 @@ def day_page(year, month, day):
 def update_goal_status(goal_id):
     goal = Goal.query.get_or_404(goal_id)
     data = request.json
-    new_status = data.get('status')
-
-    if new_status in ['todo', 'in_progress', 'blocked', 'done']:
-        goal.status = new_status
-        # SYNC completed WITH status
-        goal.completed = (new_status == 'done')
+    if _set_goal_status(goal, data.get('status')):
         db.session.commit()
     return jsonify({'status': 'success'})
 
 
+def _set_goal_status(goal, new_status):
+    if new_status not in KANBAN_COLUMNS:
+        return False
+    goal.status = new_status
+    # SYNC completed WITH status
+    goal.completed = (new_status == 'done')
+    return True
+
+
 # ADD SUB-GOAL
 # app/routes.py — add_subgoal
 # app/routes.py — add_subgoal
@@ -659,7 +582,10 @@ def add_subgoal(parent_id):
         completed=data.get('completed', False),
         parent_id=parent_id  # ← ALREADY INT FROM URL
     )
+    goal.rank = next_rank(Goal, goal_column(goal))
     db.session.add(goal)
+    db.session.flush()  # need the id for the materialized path
+    place_goal(goal)
     db.session.commit()
     return jsonify({
         'success': True,
@@ -684,17 +610,11 @@ def add_subgoal(parent_id):
 # DELETE GOAL
 @bp.route('/api/goals/<int:goal_id>', methods=['DELETE'])
 def delete_goal(goal_id):
-    goal = Goal.query.get_or_404(goal_id)
-    # Delete all children recursively
-    def delete_children(g):
-        for child in g.children:
-            delete_children(child)
-            db.session.delete(child)
-        db.session.delete(g)
-    
-    delete_children(goal)
+    Goal.query.get_or_404(goal_id)
+    # Goal + all descendants in ONE set-based DELETE
+    deleted = delete_goal_subtree(goal_id)
     db.session.commit()
-    return jsonify({'status': 'success'})
+    return jsonify({'status': 'success', 'deleted': deleted})
 
 # EDIT GOAL
 @bp.route('/api/goals/<int:goal_id>', methods=['PUT'])
@@ -719,72 +639,15 @@ def edit_goal(goal_id):
 
 @bp.route('/api/note/<path:key>', methods=['GET', 'POST'])
 def api_note(key):
-    parts = key.split('-')
-    if len(parts) < 4 or parts[0] != 'note':
-        abort(400)
-    #print(key)
-    scope = parts[1]
-    type_ = parts[-1]
-    year = None
-    quarter = None
-    month = None
-    week = None
-    day = None
-    
-    time = None
-    index = None
-
-    i = 2
-    if i < len(parts) and parts[i].isdigit():
-        year = int(parts[i])
-        i += 1
-
-    if scope == 'quarter' and i < len(parts) and parts[i].isdigit():
-        quarter = int(parts[i])
-        i += 1
-
-    #if scope in ['month', 'quarter', 'week', 'day'] and i < len(parts) and parts[i].isdigit():
-    if scope in ['month', 'day'] and i < len(parts) and parts[i].isdigit():
-        month = int(parts[i])
-        i += 1
-
-    if scope == 'week' and i < len(parts) and parts[i].isdigit():
-        week = int(parts[i])
-        i += 1
-
-    if scope == 'day' and i < len(parts) and parts[i].isdigit():
-        day = int(parts[i])
-        i += 1
-
-    i += 1 #skip the type
-
-    if scope == 'day' and i < len(parts) and ':' in parts[i] and len(parts[i]) == 5:
-        time = parts[i]
-        i += 1
-
-    if scope == 'day' and i < len(parts) and parts[i].isdigit():
-        index = int(parts[i])
-        i += 1
-
-    if year is None:
+    address = parse_note_key(key)
+    if address is None:
         abort(400)
 
-    filters = {
-        'scope': scope,
-        'year': year,
-        'quarter': quarter,
-        'month': month,
-        'week': week,
-        'day': day,
-        'type': type_,
-        'time': time,
-        'index': index,
-        }
-    #print(filters)
-    filters = {k: v for k, v in filters.items() if v is not None}
-
     if request.method == 'GET':
-        note = Note.query.filter_by(**filters).first()
+        # Only the two columns we return, matched on the full uix_note key
+        note = db.session.query(Note.content, Note.completed).filter(
+            address_filter(address)
+        ).first()
         return jsonify({
             'content': note.content if note else '',
             'completed': note.completed if note else False
@@ -795,19 +658,58 @@ def api_note(key):
         content = data.get('content', '')
         completed = data.get('completed', False)
 
-        note = Note.query.filter_by(**filters).first()
+        note = Note.query.filter(address_filter(address)).first()
         if not note:
-            note = Note(**filters)
+            note = Note(**address._asdict())
             db.session.add(note)
-            db.session.flush()
-        
+
         # ALWAYS UPDATE CONTENT & COMPLETED — whether new or existing
         note.content = content
         note.completed = completed
-        
+
         db.session.commit()
         return jsonify({'status': 'saved'})
-    
+
+
+# BULK READ: every note for one page window in ONE request + ONE query
+# e.g. GET /api/notes?scope=day&year=2026&month=10&day=18
+# BULK WRITE: POST {"notes": {"<key>": {"content": ..., "completed": ...}}} → ONE transaction
+@bp.route('/api/notes', methods=['GET', 'POST'])
+def api_notes():
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        notes = data.get('notes')
+        if not isinstance(notes, dict) or not notes:
+            return jsonify({'error': 'Expected {"notes": {key: {content, completed}}}'}), 400
+        if not all(isinstance(v, dict) for v in notes.values()):
+            return jsonify({'error': 'Each note must be an object'}), 400
+
+        try:
+            saved = save_notes(notes)
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
+
+        db.session.commit()
+        return jsonify({'status': 'saved', 'saved': saved})
+
+    scope = request.args.get('scope', '').strip()
+    if not scope:
+        abort(400)
+
+    window = {}
+    for field in WINDOW_FIELDS:
+        value = request.args.get(field, '').strip()
+        if value:
+            if not value.isdigit():
+                abort(400)
+            window[field] = int(value)
+
+    if 'year' not in window:
+        abort(400)
+
+    return jsonify({'notes': notes_in_window(scope, **window)})
+
 
 @bp.route('/api/event', methods=['POST'])
 def api_create_event():
@@ -843,6 +745,7 @@ def api_event(event_id):
         })
     elif request.method == 'DELETE':
         db.session.delete(event)
+        record_tombstones('event', [event_id])
         db.session.commit()
         return jsonify({'status': 'deleted'})
     
@@ -893,135 +796,101 @@ def api_update_event(event_id):
 
 @bp.route('/backup')
 def backup_db():
-    db_filename = 'wfm_planner.db'
-    db_path = os.path.join(current_app.instance_path, db_filename)
-    backup_dir = os.path.join(current_app.instance_path, 'backups')
-
-    # 1. Ensure backup dir exists
+    # ONLINE BACKUP IN A BACKGROUND THREAD — returns immediately
+    # ?compress=gzip|zstd for a compressed copy; poll /api/backup/status
+    compression = request.args.get('compress', '').strip().lower() or None
     try:
-        os.makedirs(backup_dir, exist_ok=True)
-    except Exception as e:
-        current_app.logger.error(f"Failed to create backup dir: {e}")
-        flash("Failed to create backup directory", "danger")
-        return redirect(url_for('main.index'))
-
-    # 2. Validate DB exists
-    if not os.path.exists(db_path):
-        flash("Database file not found!", "danger")
-        return redirect(url_for('main.index'))
-
-    # 3. Prevent huge files
-    try:
-        db_size = os.path.getsize(db_path)
-        if db_size > 100 * 1024 * 1024:  # 100MB
-            flash("Database too large to backup (>100MB)", "danger")
-            return redirect(url_for('main.index'))
+        job = start_backup(current_app._get_current_object(), compression)
+        flash(f"Backup started: {job['filename']}", "success")
+    except ValueError as e:
+        flash(str(e), "danger")
     except Exception as e:
-        current_app.logger.error(f"Failed to check DB size: {e}")
-        flash("Failed to access database", "danger")
-        return redirect(url_for('main.index'))
-
-    # 4. Generate safe filename
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_filename = f"backup_{timestamp}.db"
-    backup_path = os.path.join(backup_dir, backup_filename)
-
-    # 5. Copy with error handling
-    try:
-        shutil.copy2(db_path, backup_path)  # copy2 preserves metadata
-        current_app.logger.info(f"Backup created: {backup_filename}")
-        flash(f"Backup created: {backup_filename}", "success")
-    except Exception as e:
-        current_app.logger.error(f"Backup failed: {e}")
+        current_app.logger.error(f"Backup failed to start: {e}")
         flash("Backup failed. Check server logs.", "danger")
 
     return redirect(url_for('main.index'))
 
-from flask import current_app
-import shutil
+
+@bp.route('/api/backup/status', defaults={'job_id': None})
+@bp.route('/api/backup/status/<job_id>')
+def backup_status(job_id):
+    job = get_backup_job(job_id)
+    if job is None:
+        return jsonify({'status': 'none'}), 404
+    return jsonify(job)
 
 @bp.route('/restore', methods=['GET', 'POST'])
 def restore_db():
     if request.method == 'POST':
+        # === RESTORE A LISTED BACKUP BY NAME, OR AN UPLOAD — BOTH STREAMED ===
+        backup_name = request.form.get('backup', '').strip()
         file = request.files.get('file')
-        if not file or not file.filename:
-            flash("No file selected", "danger")
-            return redirect(request.url)
-
-        # 1. Validate filename
-        if not file.filename.lower().endswith('.db'):
-            flash("File must be a .db SQLite database", "danger")
-            return redirect(request.url)
-
-        # 2. Read & validate size
         try:
-            file_data = file.read()
-            if len(file_data) > 50 * 1024 * 1024:  # 50MB max
-                flash("File too large (max 50MB)", "danger")
-                return redirect(request.url)
-
-            # 3. Basic SQLite header check
-            if not file_data.startswith(b'SQLite format 3\x00'):
-                flash("Not a valid SQLite database", "danger")
+            if backup_name:
+                restore_backup(current_app._get_current_object(), backup_name)
+            elif file and file.filename:
+                restore_database(current_app._get_current_object(), file.stream, file.filename)
+            else:
+                flash("No file selected", "danger")
                 return redirect(request.url)
 
-            # 4. Save securely
-            db_path = os.path.join(current_app.instance_path, 'wfm_planner.db')
-            with open(db_path, 'wb') as f:
-                f.write(file_data)
-
+            current_app.logger.info(f"Database restored from {backup_name or file.filename}")
             flash("Database restored successfully!", "success")
             return redirect(url_for('main.index'))
 
+        except RestoreError as e:
+            flash(str(e), "danger")
+            return redirect(request.url)
         except Exception as e:
             current_app.logger.error(f"Restore failed: {e}")
             flash("Restore failed. Check server logs.", "danger")
             return redirect(request.url)
 
     # === GET: List backups ===
-    backup_dir = os.path.join(current_app.instance_path, 'backups')
     try:
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir, exist_ok=True)
-            backups = []
-        else:
-            backups = [
-                f for f in os.listdir(backup_dir)
-                if f.endswith('.db') and os.path.isfile(os.path.join(backup_dir, f))
-            ]
-            backups.sort(
-                key=lambda x: os.path.getmtime(os.path.join(backup_dir, x)),
-                reverse=True
-            )
+        backups = list_backups(backup_dir_for(current_app))
     except Exception as e:
         current_app.logger.error(f"Failed to list backups: {e}")
         backups = []
         flash("Could not load backup list", "warning")
 
-    today = date.today()
-    today_quarter = (today.month - 1) // 3 + 1
-
     return render_template(
         'restore.html',
         backups=backups,
     )
 
-import json
-from flask import send_file, request, flash, redirect, url_for, Response
+
+@bp.route('/backups/<path:name>')
+def download_backup(name):
+    backup_dir = backup_dir_for(current_app)
+    if name not in {b['name'] for b in list_backups(backup_dir)}:
+        abort(404)
+    return send_from_directory(backup_dir, name, as_attachment=True)
+
+from flask import send_file, request, flash, redirect, url_for, Response, stream_with_context
 
 @bp.route('/export-json')
 def export_json():
-    data = {}
-    for table_name in db.metadata.tables.keys():
-        model = globals().get(table_name.capitalize())
-        if not model or not hasattr(model, 'query') or not hasattr(model, 'to_dict'):
-            continue
-        data[table_name] = [row.to_dict() for row in model.query.all()]
-
-    json_str = json.dumps(data, indent=2)
-    resp = Response(json_str, mimetype='application/json')
+    # STREAMED — rows are serialized chunk by chunk, never the whole DB in RAM
+    # ?gzip=1 → compressed .json.gz download
+    # ?since=<ISO timestamp, UTC> → only rows changed/deleted after it (delta)
+    since = request.args.get('since', '').strip()
+    if since:
+        try:
+            since = datetime.fromisoformat(since.replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({'error': 'since must be an ISO timestamp'}), 400
+        if since.tzinfo:
+            since = since.astimezone(timezone('UTC')).replace(tzinfo=None)  # stored stamps are naive UTC
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    resp.headers['Content-Disposition'] = f'attachment; filename=wfm_planner_{ts}.json'
+    chunks = iter_export_json(since or None)
+
+    if request.args.get('gzip') in ('1', 'true', 'yes'):
+        resp = Response(stream_with_context(gzip_chunks(chunks)), mimetype='application/gzip')
+        resp.headers['Content-Disposition'] = f'attachment; filename=wfm_planner{"_delta" if since else ""}_{ts}.json.gz'
+    else:
+        resp = Response(stream_with_context(chunks), mimetype='application/json')
+        resp.headers['Content-Disposition'] = f'attachment; filename=wfm_planner{"_delta" if since else ""}_{ts}.json'
     return resp
 
 
@@ -1033,136 +902,27 @@ from app.models import TaskStatus  # ← Make sure this is imported
 def import_json():
     if request.method == 'POST':
         file = request.files['file']
-        if file and file.filename.endswith('.json'):
+        name = (file.filename or '').lower() if file else ''
+        if file and (name.endswith('.json') or name.endswith('.json.gz')):
             try:
-                data = json.load(file)
-
-                for table, rows in data.items():
-                    model_name = table.capitalize()
-                    model = globals().get(model_name)
-                    if not model:
-                        continue
-
-                    # =================================================================
-                    # SPECIAL HANDLING FOR GOAL — HIERARCHY MUST SURVIVE THE IMPORT!
-                    # =================================================================
-                    if table == 'goal':
-                        # Clear all existing goals
-                        db.session.query(model).delete()
-
-                        # Mapping: old exported ID → newly created Goal object
-                        old_to_new_goal = {}
-                        # List of goals that need their parent_id fixed after creation
-                        pending_reparents = []
-
-                        for row in rows:
-                            old_id = row.get('id')
-                            old_parent_id = row.get('parent_id')
-
-                            # Strip IDs — DB assigns fresh ones
-                            row.pop('id', None)
-                            row.pop('parent_id', None)  # We'll set this correctly later
-
-                            # === DATE CONVERSIONS ===
-                            if 'due_date' in row and row['due_date']:
-                                try:
-                                    row['due_date'] = datetime.strptime(row['due_date'], '%Y-%m-%d').date()
-                                except ValueError:
-                                    row['due_date'] = None
-
-                            # === STATUS VALIDATION ===
-                            if 'status' in row:
-                                valid = {'todo', 'in_progress', 'blocked', 'done'}
-                                row['status'] = row['status'] if row['status'] in valid else 'todo'
-
-                            # Create the goal (no parent_id yet)
-                            goal = Goal(**row)
-                            db.session.add(goal)
-                            db.session.flush()  # This generates goal.id
-
-                            # Save mapping from old ID → new object
-                            if old_id is not None:
-                                old_to_new_goal[old_id] = goal
-
-                            # Queue for reparenting if it had a parent
-                            if old_parent_id is not None:
-                                pending_reparents.append((goal, old_parent_id))
-
-                        # === SECOND PASS: REBUILD THE FAMILY TREE, BROTHER! ===
-                        for goal, old_parent_id in pending_reparents:
-                            parent_goal = old_to_new_goal.get(old_parent_id)
-                            goal.parent_id = parent_goal.id if parent_goal else None
-
-                        # No need to add again — all objects already in session
-                        continue  # Skip normal processing below
-
-                    # =================================================================
-                    # ALL OTHER TABLES — STANDARD IMPORT (Task, Event, Note, etc.)
-                    # =================================================================
-                    else:
-                        # Clear existing data
-                        db.session.query(model).delete()
-
-                        for row in rows:
-                            row.pop('id', None)  # Let DB assign new ID
-
-                            # === DATE CONVERSIONS ===
-                            date_fields = ['due_date', 'start_date', 'end_date', 'date']
-                            for field in date_fields:
-                                if field in row and row[field]:
-                                    try:
-                                        row[field] = datetime.strptime(row[field], '%Y-%m-%d').date()
-                                    except ValueError:
-                                        row[field] = None
-
-                            # === TIME CONVERSIONS ===
-                            time_fields = ['start_time', 'end_time']
-                            for field in time_fields:
-                                if field in row and row[field]:
-                                    try:
-                                        row[field] = datetime.strptime(row[field], '%H:%M:%S').time()
-                                    except ValueError:
-                                        row[field] = None
-
-                            # === DATETIME CONVERSIONS ===
-                            if 'created_at' in row and row['created_at']:
-                                try:
-                                    row['created_at'] = datetime.fromisoformat(
-                                        row['created_at'].replace('Z', '+00:00')
-                                    )
-                                except ValueError:
-                                    row['created_at'] = datetime.utcnow()
-
-                            # === ENUM / STATUS FIXES ===
-                            if table == 'task' and 'status' in row:
-                                try:
-                                    row['status'] = TaskStatus(row['status'])
-                                except ValueError:
-                                    row['status'] = TaskStatus.TODO
-
-                            if table == 'goal' and 'status' in row:
-                                valid = {'todo', 'in_progress', 'blocked', 'done'}
-                                row['status'] = row['status'] if row['status'] in valid else 'todo'
-
-                            # === CREATE OBJECT ===
-                            obj = model(**row)
-                            db.session.add(obj)
+                # PARSED INCREMENTALLY + BATCH INSERTS — the upload is never loaded whole
+                stream = gzip.GzipFile(fileobj=file.stream) if name.endswith('.gz') else file.stream
+                counts = import_json_stream(stream)
 
                 # ONE BIG COMMIT — ALL TABLES, ALL HIERARCHY INTACT!
                 db.session.commit()
+                current_app.logger.info(f"Import complete: {counts}")
                 flash("Database imported successfully! Goal hierarchy fully restored, brother!", "success")
                 return redirect(url_for('main.index'))
 
             except Exception as e:
                 db.session.rollback()
                 flash(f"Import failed: {str(e)}", "danger")
-                app.logger.error(f"Import error: {e}", exc_info=True)
+                current_app.logger.error(f"Import error: {e}", exc_info=True)
 
         flash("Invalid file", "danger")
 
     # GET: Show upload form
-    today = date.today()
-    today_quarter = (today.month - 1) // 3 + 1
     return render_template('import_json.html')
 
 # --------------------------------------------------------------
@@ -1190,6 +950,7 @@ def api_add_task():
         category=data.get('category', None),
         notes=data.get('notes', '')
     )
+    task.rank = next_rank(Task, task_column(task))  # bottom of its column, with room to reorder
   
 
     #print(task)
@@ -1204,20 +965,28 @@ def api_add_task():
 @bp.route('/api/task/<int:task_id>/status', methods=['POST'])  # Or @app.route
 def api_update_status(task_id):
     data = request.json
-    status_str = data.get('status', '').strip().upper()  # ← UPPERCASE IT
-    
-    if status_str not in [e.name for e in TaskStatus]:
+    task = Task.query.get_or_404(task_id)
+    if not _set_task_status(task, data.get('status', '')):
         return jsonify(success=False, error="Invalid status"), 400
+    db.session.commit()
+    
+    return jsonify(success=True)
 
-    task = Task.query.get_or_404(task_id)
+
+def _set_task_status(task, status):
+    """Drag-and-drop status change, dates and all. False if the status is bogus."""
+    status_str = (status or '').strip().upper()  # ← UPPERCASE IT
     
+    if status_str not in [e.name for e in TaskStatus]:
+        return False
+
     new_status = TaskStatus[status_str]  # ← Now works with 'BLOCKED'
     
     # Set date to today when marked DONE
     if new_status == TaskStatus.DONE:
         task.date = date.today()
         #current_app.logger.info(f"Task {task.id}: marked DONE on {task.date}")
-    elif data['status'] == 'backlog':
+    elif new_status == TaskStatus.BACKLOG:
         task.date = None                       # ← CLEAR THE DATE
     else:
         # Any other status change on a dated task → keep today's date
@@ -1226,9 +995,7 @@ def api_update_status(task_id):
     
     
     task.status = new_status
-    db.session.commit()
-    
-    return jsonify(success=True)
+    return True
 
 from typing import Tuple
 
@@ -1309,265 +1076,56 @@ def week_range(year: int, month: int, day: int) -> tuple[date, date]:
 
 from flask import jsonify
 from datetime import datetime, date, timedelta
-import requests
 from icalendar import Calendar
 import pytz
 
-# ——— THE EXPANDER — DEFINED ONCE, AT THE TOP — LIKE A TRUE CHAMPION ———
-def expand_recurring_event(base_start_utc, base_end_utc, rrule_str, target_date):
-    occurrences = []
-    params = {}
-    for part in rrule_str.upper().split(';'):
-        if '=' not in part:
-            continue
-        k, v = part.split('=', 1)
-        params[k] = v
+MAX_IMPORT_DAYS = 92   # one quarter per request is plenty
 
-    if params.get('FREQ') != 'WEEKLY':
-        return []
 
-    interval = int(params.get('INTERVAL', '1'))
-    until_str = params.get('UNTIL')
-    byday = params.get('BYDAY', '')
+def _parse_datestr(datestr):
+    """YYYYMMDD → date (ValueError if it isn't one)."""
+    if not (datestr and len(datestr) == 8 and datestr.isdigit()):
+        raise ValueError(datestr)
+    return date(int(datestr[:4]), int(datestr[4:6]), int(datestr[6:8]))
 
-    duration = base_end_utc - base_start_utc
 
-    # Parse UNTIL
-    until_dt = None
-    if until_str and len(until_str) >= 15:
-        try:
-            until_dt = datetime.strptime(until_str[:15], "%Y%m%dT%H%M%S")
-            if until_str.endswith('Z'):
-                until_dt = until_dt.replace(tzinfo=None)
-        except:
-            pass
-
-    # Map BYDAY
-    weekday_map = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
-    target_weekdays = [weekday_map[d.strip()] for d in byday.split(',') if d.strip() in weekday_map]
-    if not target_weekdays:
-        target_weekdays = [base_start_utc.weekday()]
-
-    # Find Monday of original week
-    week_monday = base_start_utc - timedelta(days=base_start_utc.weekday())
-    current_week_monday = week_monday
-
-    while current_week_monday.date() <= target_date + timedelta(days=365):
-        if until_dt and current_week_monday >= until_dt:
-            break
-
-        for wd in target_weekdays:
-            candidate = current_week_monday + timedelta(days=wd)
-            if candidate.date() < base_start_utc.date():
-                continue
-            if until_dt and candidate >= until_dt:
-                continue
-            if candidate.date() == target_date:
-                start_time = base_start_utc.time()
-                end_time = (base_start_utc + duration).time()
-                occurrences.append((start_time, end_time))
-
-        current_week_monday += timedelta(days=7 * interval)
-
-    return occurrences
-
-
-@bp.route('/api/import-calendar', defaults={'datestr': None})
-@bp.route('/api/import-calendar/<datestr>')
-def import_calendar(datestr):
-    target_date = date.today()
-    if datestr and len(datestr) == 8 and datestr.isdigit():
-        try:
-            target_date = date(int(datestr[:4]), int(datestr[4:6]), int(datestr[6:8]))
-        except:
-            return jsonify({'success': False, 'error': 'Bad date'}), 400
+@bp.route('/api/import-calendar', defaults={'datestr': None, 'enddatestr': None})
+@bp.route('/api/import-calendar/<datestr>', defaults={'enddatestr': None})
+@bp.route('/api/import-calendar/<datestr>/<enddatestr>')
+def import_calendar(datestr, enddatestr):
+    # One day (default today), or a whole window: /api/import-calendar/20261001/20261031
+    # or ?days=30 — the feed is parsed ONCE and every RRULE expanded ONCE for the window
+    try:
+        start_date = _parse_datestr(datestr) if datestr else date.today()
+        if enddatestr:
+            end_date = _parse_datestr(enddatestr)
+        else:
+            end_date = start_date + timedelta(days=max(int(request.args.get('days', 1)), 1) - 1)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Bad date'}), 400
+    if end_date < start_date or (end_date - start_date).days >= MAX_IMPORT_DAYS:
+        return jsonify({'success': False, 'error': f'Date range must be 1-{MAX_IMPORT_DAYS} days'}), 400
 
     ics_url = os.getenv('ICS_CALENDAR_URL', '').split('?')[0]
 
     try:
-        response = requests.get(ics_url, timeout=30)
-        response.raise_for_status()
-        ics_content = response.text
-
-        # ———— REUSE YOUR WORKING SCRIPT LOGIC 100% ————
-        from dateutil.rrule import rrulestr
-        from dateutil.tz import tzutc
-        from pytz import timezone
-        import re
-
-        central = timezone("America/Chicago")
-
-        # Your exact _parse_dt from the working script
-        _OUTLOOK_TZ_MAP = {
-            "Eastern Standard Time": "America/New_York",
-            "Eastern Daylight Time": "America/New_York",
-            "Central Standard Time": "America/Chicago",
-            "Central Daylight Time": "America/Chicago",
-            "Pacific Standard Time": "America/Los_Angeles",
-            "Mountain Standard Time": "America/Denver",
-            "India Standard Time": "Asia/Kolkata",
-        }
+        # Conditional GET + only changed VEVENTs re-parsed — see calendar_import.py
+        feed = get_feed(ics_url, os.path.join(current_app.instance_path, 'ics_cache'))
+        all_events, feed_stats = feed.refresh()
+        imported_events = instances_between(all_events, start_date, end_date, current_app.logger)
 
-        def _parse_dt(val, tzid=None, is_date=False):
-            val = val.split(':')[-1]
-            val = val[:-1] if val.endswith('Z') else val
-            if is_date or len(val) == 8:
-                return datetime.strptime(val, "%Y%m%d").date()
-            dt = datetime.strptime(val[:15], "%Y%m%dT%H%M%S")
-            if tzid and tzid in _OUTLOOK_TZ_MAP:
-                tz = timezone(_OUTLOOK_TZ_MAP[tzid])
-                dt = tz.localize(dt)
-            elif val.endswith('Z'):
-                dt = dt.replace(tzinfo=tzutc())
-            else:
-                dt = timezone("America/Chicago").localize(dt)
-            return dt.astimezone(central)
-
-        def _compute_end(start, end_dt, duration):
-            central = timezone("America/Chicago")
-            if end_dt:
-                if end_dt.tzinfo is None:
-                    end_dt = central.localize(end_dt)
-                return end_dt.astimezone(central)
-            if duration:
-                match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?', duration)
-                if match:
-                    h = int(match.group(1) or 0)
-                    m = int(match.group(2) or 0)
-                    return start + timedelta(hours=h, minutes=m)
-            return start + timedelta(hours=1)
-
-        def _to_date(dt):
-            return dt.date() if hasattr(dt, 'date') else dt
-
-        # Parse all events exactly like your script
-        all_events = []
-        lines = [l.rstrip() for l in ics_content.replace('\r\n', '\n').split('\n')]
-        i = 0
-        in_event = False
-        event = None
-
-        while i < len(lines):
-            line = lines[i]
-            while i + 1 < len(lines) and lines[i + 1].startswith((' ', '\t')):
-                i += 1
-                line += lines[i][1:].lstrip()
-
-            if line == "BEGIN:VEVENT":
-                event = {
-                    "UID": None, "SUMMARY": "", "DTSTART": None, "DTEND": None,
-                    "DURATION": None, "RRULE": None, "EXDATE": [], 
-                    "LOCATION": "", "DESCRIPTION": "", "AllDay": False,
-                    "RECURRENCE-ID": None,
-                }
-                in_event = True
-
-            elif line == "END:VEVENT" and in_event:
-                all_events.append(event.copy())
-                in_event = False
-
-            elif in_event and ':' in line:
-                key_part, value = line.split(':', 1)
-                params = {}
-                if ';' in key_part:
-                    key = key_part.split(';')[0]
-                    param_str = ';' + key_part[len(key):]
-                    for m in re.finditer(r';([^=;]+)=([^;]+)', param_str):
-                        params[m.group(1)] = m.group(2)
-                else:
-                    key = key_part
-
-                value = value.replace('\\n', '\n').replace('\\,', ',').replace('\\;', ';')
-
-                if key == "SUMMARY": event["SUMMARY"] = value
-                elif key == "LOCATION": event["LOCATION"] = value
-                elif key == "DESCRIPTION": event["DESCRIPTION"] = value
-                elif key == "UID": event["UID"] = value
-                elif key == "RRULE": event["RRULE"] = value
-                elif key == "EXDATE":
-                    for ex in value.split(','):
-                        event["EXDATE"].append(_parse_dt(ex))
-                elif key == "DTSTART":
-                    event["DTSTART"] = _parse_dt(value, params.get("TZID"), "VALUE=DATE" in key_part)
-                    event["AllDay"] = "VALUE=DATE" in key_part
-                elif key == "DTEND":
-                    event["DTEND"] = _parse_dt(value, params.get("TZID"), "VALUE=DATE" in key_part)
-                elif key == "DURATION": event["DURATION"] = value
-                elif key == "RECURRENCE-ID":
-                    event["RECURRENCE-ID"] = _parse_dt(value, params.get("TZID"))
-
-            i += 1
-
-        # Build exceptions map
-        exceptions = {}
-        for e in all_events:
-            if e["RECURRENCE-ID"]:
-                uid = e["UID"]
-                exc_date = _to_date(e["RECURRENCE-ID"])
-                exceptions.setdefault(uid, set()).add(exc_date)
-
-        # Final processing — exactly like your script
-        imported_events = []
-        for e in all_events:
-            start = e["DTSTART"]
-            if not start:
-                continue
-
-            if e["RECURRENCE-ID"]:
-                if _to_date(start) == target_date:
-                    imported_events.append(e.copy())
-                continue
-
-            if not e["RRULE"]:
-                if _to_date(start) == target_date:
-                    imported_events.append(e.copy())
-                continue
-
-            try:
-                base_start = start.replace(tzinfo=tzutc()) if start.tzinfo is None else start
-                rule = rrulestr(e["RRULE"], dtstart=base_start)
-                window_start = datetime.combine(target_date, datetime.min.time()).replace(tzinfo=tzutc())
-                window_end = window_start + timedelta(days=1)
-
-                for inst_start in rule.between(window_start, window_end, inc=True):
-                    inst_date = inst_start.date()
-                    uid = e["UID"]
-
-                    if uid in exceptions and inst_date in exceptions[uid]:
-                        continue
-                    if any(_to_date(ex) == inst_date for ex in e["EXDATE"]):
-                        continue
-
-                    inst_end = _compute_end(inst_start, e["DTEND"], e["DURATION"])
-                    new_e = e.copy()
-                    new_e["DTSTART"] = inst_start
-                    new_e["DTEND"] = inst_end
-                    imported_events.append(new_e)
-
-            except Exception as ex:
-                print(f"RRULE FAILED → {e.get('SUMMARY', 'Unknown')}: {ex}")
-
-        # Save to DB
-        imported = 0
-        for ev in imported_events:
-            if ev["AllDay"]:
-                continue  # Skip all-day if you want
-
-            event = Event(
-                title=ev["SUMMARY"] or "No Title",
-                start_date=target_date,
-                end_date=target_date,
-                start_time=ev["DTSTART"].time(),
-                end_time=ev["DTEND"].time() if ev["DTEND"] else None,
-            )
-            db.session.add(event)
-            imported += 1
+        # Upsert on (UID, instance) — re-importing the same window changes nothing
+        changes = save_instances(imported_events, start_date, end_date)
+        imported = changes['inserted'] + changes['updated']
 
         db.session.commit()
         return jsonify({
             'success': True,
-            'date': target_date.strftime('%Y-%m-%d'),
+            'date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d'),
             'imported': imported,
+            'changes': changes,
+            'feed': feed_stats,
             'message': f"Imported {imported} events in Central Time — NO GHOSTS, NO LIES!"
         })
 
@@ -1599,10 +1157,54 @@ def update_goal_rank(goal_id):
     db.session.commit()
     return jsonify({'success': True})
 
+# MOVE A CARD BETWEEN TWO OTHERS — one row updated, one round-trip, any column size
+# Body: {"prev_id": card above or null, "next_id": card below or null, "status": optional}
+def _move_card(model, item, set_status, column):
+    data = request.get_json() or {}
+    if data.get('status') and not set_status(item, data['status']):
+        return jsonify(success=False, error="Invalid status"), 400
+    try:
+        rebalanced = move_between(model, item, data.get('prev_id'), data.get('next_id'), column=column)
+    except RankError as e:
+        db.session.rollback()
+        return jsonify(success=False, error=str(e)), 409   # board is stale — reload it
+    db.session.commit()
+    return jsonify(success=True, rank=item.rank, rebalanced=rebalanced)
+
+@bp.route('/api/task/<int:task_id>/move', methods=['POST'])
+def move_task(task_id):
+    return _move_card(Task, Task.query.get_or_404(task_id), _set_task_status, task_column)
+
+@bp.route('/api/goals/<int:goal_id>/move', methods=['POST'])
+def move_goal(goal_id):
+    return _move_card(Goal, Goal.query.get_or_404(goal_id), _set_goal_status, goal_column)
+
+# BATCH — morning triage in ONE request and ONE commit
+# Body: {"ops": [{"op": "status"|"today"|"rank"|"delete"|"edit", "id": ..., ...}, ...]}
+# Op formats in tasks.apply_batch(); every op gets a result, bad ones are skipped
+@bp.route('/api/tasks/batch', methods=['POST'])
+def api_tasks_batch():
+    data = request.get_json(silent=True) or {}
+    ops = data.get('ops')
+    if not isinstance(ops, list) or not ops:
+        return jsonify(success=False, error="'ops' must be a non-empty list"), 400
+    if len(ops) > MAX_BATCH_OPS:
+        return jsonify(success=False, error=f"At most {MAX_BATCH_OPS} ops per batch"), 400
+    try:
+        results = apply_batch(ops)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Task batch failed")   # details stay in the log, not the response
+        return jsonify(success=False, error="Batch failed — nothing was applied"), 500
+    failed = sum(1 for r in results if not r['ok'])
+    return jsonify(success=True, applied=len(results) - failed, failed=failed, results=results)
+
 @bp.route('/api/task/<int:task_id>', methods=['DELETE'])
 def delete_task(task_id):
     task = Task.query.get_or_404(task_id)  
     db.session.delete(task)
+    record_tombstones('task', [task_id])
     db.session.commit()
     return jsonify(success=True), 200
 
@@ -1,6 +1,51 @@
 // app/static/js/autosave.js — FINAL, CLEAN, UNBREAKABLE
 document.addEventListener('DOMContentLoaded', function () {
 
+    // Textareas grouped by page window (scope + period) → ONE bulk GET per window
+    const windows = new Map();
+
+    // === WRITE QUEUE — LATEST VALUE PER KEY, FLUSHED AS ONE BATCH POST ===
+    const pending = new Map();
+    let flushTimer;
+
+    function flush(keepalive = false) {
+        clearTimeout(flushTimer);
+        if (!pending.size) return;
+        const batch = Object.fromEntries(pending);
+        pending.clear();
+
+        fetch('/api/notes', {
+            method: 'POST',
+            credentials: 'include',  // This sends your Basic Auth automatically
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ notes: batch }),
+            keepalive
+        })
+        .then(r => {
+            if (!r.ok) return Promise.reject(r.status);
+            // else console.log('Saved like a champ!');
+        })
+        .catch(err => {
+            console.warn('Autosave failed:', err);
+            // Re-queue anything not typed over since, retry on the next flush
+            Object.entries(batch).forEach(([key, value]) => {
+                if (!pending.has(key)) pending.set(key, value);
+            });
+        });
+    }
+
+    function queueSave(key, content) {
+        pending.set(key, { content });
+        clearTimeout(flushTimer);
+        flushTimer = setTimeout(flush, 300);
+    }
+
+    // Don't lose the last keystrokes when leaving the page
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') flush(true);
+    });
+    window.addEventListener('pagehide', () => flush(true));
+
     document.querySelectorAll('.autosave').forEach(textarea => {
         const { scope, year, quarter, month, week, day, type, time, index } = textarea.dataset;
 
@@ -15,34 +60,35 @@ document.addEventListener('DOMContentLoaded', function () {
         if (index !== undefined) parts.push(index);
         const key = parts.join('-');
 
-        // === LOAD NOTE — CREDENTIALS INCLUDED AUTOMATICALLY ===
-        fetch(`/api/note/${key}`, { credentials: 'include' })
+        // === QUEUE FOR BULK LOAD ===
+        const params = new URLSearchParams({ scope, year });
+        if (quarter) params.set('quarter', quarter);
+        if (month) params.set('month', month);
+        if (week) params.set('week', week);
+        if (day) params.set('day', day);
+        const windowQuery = params.toString();
+        if (!windows.has(windowQuery)) windows.set(windowQuery, []);
+        windows.get(windowQuery).push({ textarea, key });
+
+        // === SAVE NOTE — DEBOUNCED, COALESCED PER KEY, BATCHED ACROSS TEXTAREAS ===
+        textarea.addEventListener('input', function () {
+            queueSave(key, this.value);
+        });
+    });
+
+    // === LOAD NOTES — ONE REQUEST PER WINDOW, CREDENTIALS INCLUDED AUTOMATICALLY ===
+    windows.forEach((entries, windowQuery) => {
+        fetch(`/api/notes?${windowQuery}`, { credentials: 'include' })
             .then(r => r.ok ? r.json() : Promise.reject())
             .then(data => {
-                textarea.value = data.content || '';
+                const notes = data.notes || {};
+                entries.forEach(({ textarea, key }) => {
+                    textarea.value = notes[key] ? notes[key].content : '';
+                });
             })
             .catch(() => {
                 // Silently fail — just leave empty
-                textarea.value = '';
+                entries.forEach(({ textarea }) => { textarea.value = ''; });
             });
-
-        // === SAVE NOTE — DEBOUNCED & UNLIMITED ===
-        let timeout;
-        textarea.addEventListener('input', function () {
-            clearTimeout(timeout);
-            timeout = setTimeout(() => {
-                fetch(`/api/note/${key}`, {
-                    method: 'POST',
-                    credentials: 'include',  // This sends your Basic Auth automatically
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ content: this.value })
-                })
-                .then(r => {
-                    if (!r.ok) console.warn('Autosave failed:', r.status);
-                    // else console.log('Saved like a champ!');
-                })
-                .catch(err => console.warn('Autosave failed:', err));
-            }, 300);
-        });
     });
 });
\ No newline at end of file
@@ -26,39 +26,36 @@ export function initKanban() {
         const newStatus = evt.to.dataset.status;
         const type = evt.to.dataset.type || 'goals';
 
-        let handled = false;
+        // Neighbours in the drop column — the server slots the card between them
+        const cardId = el => (el && el.dataset.itemId) ? +el.dataset.itemId : null;
+        let prev = evt.item.previousElementSibling;
+        while (prev && !prev.dataset.itemId) prev = prev.previousElementSibling;
+        let next = evt.item.nextElementSibling;
+        while (next && !next.dataset.itemId) next = next.nextElementSibling;
+        const move = { prev_id: cardId(prev), next_id: cardId(next) };
+        const moveUrl = `/api/${type === 'goals' ? 'goals' : 'task'}/${itemId}/move`;
+        const postMove = body => fetch(moveUrl, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify(body)
+        }).then(r => {
+          if (r.status === 409) location.reload();   // someone else reordered — resync
+          return r;
+        });
 
         // 1. Backlog → Today
         if (evt.from.dataset.status === 'backlog' && type === 'tasks' && newStatus !== 'backlog') {
           fetch(`/api/task/${itemId}/today`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' }
-          }).then(() => {
+          }).then(() => postMove(move)).then(() => {
             location.reload();
           });
-          handled = true;
-        }
-
-        // 2. Normal status change
-        if (!handled) {
-          fetch(`/api/${type === 'goals' ? 'goals' : 'task'}/${itemId}/status`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ status: newStatus })
-          });
+        } else {
+          // 2. Status + priority in ONE request — only the dropped card changes
+          postMove(evt.from === evt.to ? move : { ...move, status: newStatus }).catch(() => {});
         }
 
-        // 3. Priority ranking — always runs
-        const items = Array.from(evt.to.children).filter(el => el.dataset.itemId);
-        items.forEach((item, index) => {
-          const id = item.dataset.itemId;
-          fetch(`/api/${type === 'goals' ? 'goals' : 'task'}/${id}/rank`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ rank: index })
-          }).catch(() => {});
-        });
-
         // Update badges
         document.querySelectorAll(`.kanban-column[data-type="${type}"]`).forEach(c => {
           const badge = c.closest('.card')?.querySelector('.badge');
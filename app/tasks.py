@@ -0,0 +1,304 @@
+# app/tasks.py
+import threading
+import click
+from datetime import date, datetime
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, delete, func, or_, select, union_all, update
+from . import db
+from .models import Task, TaskStatus
+from .ranking import RankError, move_between
+from .transfer import record_tombstones
+
+# Statuses that get a Kanban column on the day page (BACKLOG has its own list)
+KANBAN_STATUSES = (TaskStatus.TODO, TaskStatus.IN_PROGRESS, TaskStatus.BLOCKED, TaskStatus.DONE)
+# Unfinished statuses that follow you to the next day
+OPEN_STATUSES = (TaskStatus.TODO, TaskStatus.IN_PROGRESS, TaskStatus.BLOCKED)
+
+
+def _board_conditions(target_date, today):
+    """
+    The day page's task set as disjoint conditions, each one a single range on
+    ix_task_status_date_rank (status first, then date) — never a table scan.
+    The daily rollover (below) normally leaves nothing open before today, but a
+    task can be given a past date any time after it ran — so today still picks
+    those up instead of losing them until tomorrow.
+    """
+    if target_date < today:
+        # PAST: only what was completed on that day
+        yield and_(Task.status == TaskStatus.DONE, Task.date == target_date)
+    else:
+        # TODAY / FUTURE: everything scheduled for that exact date
+        yield and_(Task.status.in_(KANBAN_STATUSES), Task.date == target_date)
+    if target_date == today:
+        # + open work left behind since the last rollover
+        yield and_(Task.status.in_(OPEN_STATUSES), Task.date < today)
+        yield and_(Task.status.in_(OPEN_STATUSES), Task.date.is_(None))
+    yield Task.status == TaskStatus.BACKLOG
+
+
+def task_column(task, neighbour=None, today=None):
+    """
+    Conditions covering the board column `task` shows in — what a rerank may
+    rewrite. Open work dated today or earlier (or undated) shares today's
+    column, mirroring _board_conditions(); anything else is its status on its date.
+    """
+    today = today or date.today()
+    if task.status == TaskStatus.BACKLOG:
+        return (Task.status == TaskStatus.BACKLOG,)
+    if task.status in OPEN_STATUSES and (task.date is None or task.date <= today):
+        return (Task.status == task.status, or_(Task.date <= today, Task.date.is_(None)))
+    if task.date is None:
+        return (Task.status == task.status, Task.date.is_(None))
+    return (Task.status == task.status, Task.date == task.date)
+
+
+def day_board_statement(target_date, today=None):
+    """
+    ONE statement for the day's board and the backlog: a UNION ALL of indexed
+    branches. Not a single OR — once SQLite has ANALYZE stats, the skew (years
+    of DONE rows) makes it pick a full scan for the OR form; each branch of a
+    UNION ALL always gets its own index search.
+    """
+    today = today or date.today()
+    branches = [select(Task).where(condition) for condition in _board_conditions(target_date, today)]
+    return select(Task).from_statement(union_all(*branches))
+
+
+def load_day_board(target_date, today=None):
+    """(day_tasks, backlog_tasks), each in rank order — one query, split in Python."""
+    day_tasks, backlog_tasks = [], []
+    for task in db.session.execute(day_board_statement(target_date, today)).scalars():
+        (backlog_tasks if task.status == TaskStatus.BACKLOG else day_tasks).append(task)
+    day_tasks.sort(key=lambda t: (t.rank, t.id))
+    backlog_tasks.sort(key=lambda t: (t.rank, t.id))
+    return day_tasks, backlog_tasks
+
+
+# ========= BATCH =========
+MAX_BATCH_OPS = 500
+BATCH_OPS = ('status', 'today', 'rank', 'delete', 'edit')
+EDIT_FIELDS = ('description', 'date', 'category', 'notes', 'status')
+
+
+class BatchOpError(ValueError):
+    """One op in a batch is malformed — reported in its result, the rest still run."""
+
+
+def _parse_status(value):
+    try:
+        return TaskStatus[str(value or '').strip().upper()]
+    except KeyError:
+        raise BatchOpError(f"Invalid status: {value!r}")
+
+
+def _parse_edit(fields):
+    if not isinstance(fields, dict) or not fields:
+        raise BatchOpError("'edit' needs a non-empty 'fields' object")
+    unknown = set(fields) - set(EDIT_FIELDS)
+    if unknown:
+        raise BatchOpError(f"Can't edit: {', '.join(sorted(unknown))}")
+    values = {}
+    if 'description' in fields:
+        description = fields['description']
+        if not isinstance(description, str) or not description.strip() or len(description.strip()) > 200:
+            raise BatchOpError('Description must be a string of 1-200 characters')
+        values['description'] = description.strip()
+    if 'date' in fields:
+        if fields['date'] is not None and not isinstance(fields['date'], str):
+            raise BatchOpError(f"Bad date: {fields['date']!r}")
+        try:
+            values['date'] = datetime.strptime(fields['date'], '%Y-%m-%d').date() if fields['date'] else None
+        except ValueError:
+            raise BatchOpError(f"Bad date: {fields['date']!r}")
+    for name, limit in (('category', 50), ('notes', None)):
+        if name in fields:
+            value = fields[name]
+            if value is not None and not isinstance(value, str):
+                raise BatchOpError(f"'{name}' must be a string or null")
+            if limit and value and len(value) > limit:
+                raise BatchOpError(f"'{name}' is longer than {limit} characters")
+            values[name] = value or (None if name == 'category' else '')
+    if 'status' in fields:
+        values['status'] = _parse_status(fields['status'])
+    return values
+
+
+def _parse_op(op):
+    """op dict → (kind, task id, payload). Raises BatchOpError."""
+    if not isinstance(op, dict):
+        raise BatchOpError('Each op must be an object')
+    kind = op.get('op')
+    if kind not in BATCH_OPS:
+        raise BatchOpError(f"Unknown op: {kind!r}")
+    task_id = op.get('id')
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        raise BatchOpError("Missing task 'id'")
+    if kind == 'status':
+        return kind, task_id, _parse_status(op.get('status'))
+    if kind == 'rank':
+        if 'rank' in op:
+            if not isinstance(op['rank'], int) or isinstance(op['rank'], bool):
+                raise BatchOpError("'rank' must be an integer")
+            return kind, task_id, {'rank': op['rank']}
+        if 'prev_id' in op or 'next_id' in op:
+            neighbours = (op.get('prev_id'), op.get('next_id'))
+            if any(n is not None and (not isinstance(n, int) or isinstance(n, bool)) for n in neighbours):
+                raise BatchOpError("'prev_id' / 'next_id' must be task ids or null")
+            return kind, task_id, neighbours
+        raise BatchOpError("'rank' needs a rank, or prev_id/next_id")
+    if kind == 'edit':
+        return kind, task_id, _parse_edit(op.get('fields'))
+    return kind, task_id, None
+
+
+def status_change_values(status, today):
+    """
+    SET values for a drag-and-drop status change — the same date rules as the
+    single-task endpoint, but as SQL so a whole group is ONE UPDATE.
+    """
+    if status == TaskStatus.DONE:
+        new_date = today                           # completed today
+    elif status == TaskStatus.BACKLOG:
+        new_date = None                            # backlog has no date
+    else:
+        new_date = func.coalesce(Task.date, today)  # pulled out of backlog → today
+    return {'status': status, 'date': new_date}
+
+
+def _flush_run(kind, run, today):
+    """
+    Write one run of consecutive same-kind ops. Within a run the last op per
+    task wins, so grouping them into set-based statements keeps list order.
+    """
+    if kind == 'today':
+        db.session.execute(
+            update(Task).where(Task.id.in_(list(run))).values(date=today, status=TaskStatus.TODO)
+        )
+    elif kind == 'status':
+        by_status = {}
+        for task_id, status in run.items():
+            by_status.setdefault(status, []).append(task_id)
+        for status, ids in by_status.items():
+            db.session.execute(
+                update(Task).where(Task.id.in_(ids)).values(**status_change_values(status, today))
+            )
+    elif kind == 'delete':
+        ids = list(run)
+        db.session.execute(delete(Task).where(Task.id.in_(ids)))
+        record_tombstones('task', ids)
+    elif kind in ('rank', 'edit'):
+        # Bulk UPDATE by primary key — one executemany per distinct column set
+        db.session.execute(update(Task), [{'id': task_id, **values} for task_id, values in run.items()])
+        # By-primary-key UPDATEs don't touch the session — expire any task a
+        # neighbour move already loaded so it isn't flushed back over the new values
+        for task_id in run:
+            task = db.session.identity_map.get(db.session.identity_key(Task, task_id))
+            if task is not None:
+                db.session.expire(task)
+
+
+def apply_batch(ops, today=None):
+    """
+    Apply a list of task ops in order, in the caller's transaction:
+        {"op": "status", "id": 7, "status": "done"}
+        {"op": "today",  "id": 7}                     pull to today as TODO
+        {"op": "rank",   "id": 7, "rank": 3}          or "prev_id"/"next_id" (ranking.py)
+        {"op": "delete", "id": 7}
+        {"op": "edit",   "id": 7, "fields": {"description": ..., "date": "2026-10-18" | null,
+                                             "category": ..., "notes": ..., "status": ...}}
+    Consecutive ops of the same kind become set-based UPDATE/DELETEs. A bad op
+    (unknown task, bad value, stale neighbours) is skipped and reported — the
+    rest still apply. Returns one {"index", "op", "id", "ok"[, "error"]} per op.
+    The caller commits.
+    """
+    today = today or date.today()
+    ids = {op.get('id') for op in ops if isinstance(op, dict) and isinstance(op.get('id'), int)}
+    live = set()
+    if ids:
+        live = set(db.session.execute(select(Task.id).where(Task.id.in_(ids))).scalars())
+
+    results = []
+    run_kind, run = None, {}
+    for index, op in enumerate(ops):
+        result = {'index': index, 'op': op.get('op') if isinstance(op, dict) else None,
+                  'id': op.get('id') if isinstance(op, dict) else None, 'ok': True}
+        results.append(result)
+        try:
+            kind, task_id, payload = _parse_op(op)
+            if task_id not in live:
+                raise BatchOpError('Task not found')
+        except BatchOpError as e:
+            result.update(ok=False, error=str(e))
+            continue
+
+        moving = kind == 'rank' and isinstance(payload, tuple)
+        if run and (kind != run_kind or moving):
+            _flush_run(run_kind, run, today)
+            run_kind, run = None, {}
+
+        if moving:
+            # Neighbour-relative: needs the current ranks, so it runs on its own
+            try:
+                move_between(Task, db.session.get(Task, task_id), *payload, column=task_column)
+                db.session.flush()
+            except RankError as e:
+                result.update(ok=False, error=str(e))
+            continue
+
+        if kind in ('rank', 'edit'):
+            run.setdefault(task_id, {}).update(payload)
+        else:
+            run.pop(task_id, None)      # keep the latest op last
+            run[task_id] = payload
+        run_kind = kind
+        if kind == 'delete':
+            live.discard(task_id)
+
+    if run:
+        _flush_run(run_kind, run, today)
+    return results
+
+
+# ========= ROLLOVER =========
+_rollover_lock = threading.Lock()
+
+
+def rollover_open_tasks(today=None):
+    """
+    Move every open task dated before today (or undated) onto today — ONE
+    set-based UPDATE, a range on ix_task_status_date_rank. Safe to repeat:
+    a second run the same day matches nothing. Returns rows moved; the caller commits.
+    updated_at is kept as is: housekeeping isn't an edit, so it must not put the
+    whole open backlog in every delta export (or count as a local change on a replica).
+    """
+    today = today or date.today()
+    return db.session.execute(
+        update(Task)
+        .where(Task.status.in_(OPEN_STATUSES), or_(Task.date < today, Task.date.is_(None)))
+        .values(date=today, updated_at=Task.updated_at)
+    ).rowcount
+
+
+def ensure_rolled_over(today=None):
+    """Run the rollover at most once per day per app — at startup, then on the first authenticated request after midnight."""
+    today = today or date.today()
+    state = current_app.extensions.setdefault('task_rollover', {'on': None})
+    if state['on'] == today:
+        return 0
+    with _rollover_lock:
+        if state['on'] == today:
+            return 0
+        moved = rollover_open_tasks(today)
+        db.session.commit()
+        state['on'] = today
+        return moved
+
+
+@click.command('rollover-tasks')
+@with_appcontext
+def rollover_tasks_command():
+    """Carry unfinished tasks from earlier days over to today (also runs on startup)."""
+    moved = rollover_open_tasks()
+    db.session.commit()
+    click.echo(f"Rolled over {moved} unfinished tasks to today.")
@@ -0,0 +1,380 @@
+# app/transfer.py
+import io
+import json
+import os
+import zlib
+from datetime import date, datetime, time
+from sqlalchemy import delete, insert, select, text, update
+from . import db
+from .models import ExportableMixin, Goal, TaskStatus, Tombstone
+
+EXPORT_CHUNK_ROWS = 500
+IMPORT_BATCH_ROWS = 1000
+READ_CHUNK_CHARS = 64 * 1024
+
+GOAL_STATUSES = {'todo', 'in_progress', 'blocked', 'done'}
+
+
+# Delta sync is ONE-WAY. Rows are matched on their integer id, so if two
+# databases both created rows they'd hand out the same ids and a delta would
+# silently overwrite the other side's row. Each database names itself with
+# WFM_SYNC_NAME; a replica accepts deltas only from the one database named in
+# WFM_SYNC_PRIMARY — the only place new rows should be created.
+class SyncSourceError(ValueError):
+    """A delta from somewhere other than the designated primary — refused."""
+
+
+def sync_name():
+    return os.getenv('WFM_SYNC_NAME') or None
+
+
+def check_delta_source(window):
+    """Refuse a delta unless it was exported by WFM_SYNC_PRIMARY and we aren't the primary."""
+    primary = os.getenv('WFM_SYNC_PRIMARY') or None
+    if primary is None:
+        raise SyncSourceError(
+            "Delta imports are one-way: set WFM_SYNC_PRIMARY to the WFM_SYNC_NAME "
+            "of the database the deltas come from"
+        )
+    if sync_name() == primary:
+        raise SyncSourceError(f"This database is the sync primary ({primary}) — it exports deltas, it doesn't import them")
+    source = window.get('source') if isinstance(window, dict) else None
+    if source != primary:
+        raise SyncSourceError(f"Delta from {source or 'an unnamed database'} refused — only {primary} may send deltas")
+
+
+def exportable_models():
+    """{table name: model} for every model with .to_dict(), in metadata order."""
+    by_table = {m.class_.__tablename__: m.class_ for m in db.Model.registry.mappers}
+    return {
+        table: by_table[table]
+        for table in db.metadata.tables
+        if table in by_table and hasattr(by_table[table], 'to_dict')
+    }
+
+
+def change_column(model):
+    """The timestamp a delta export filters on, or None if the table isn't tracked."""
+    return getattr(model, 'deleted_at', None) or getattr(model, 'updated_at', None)
+
+
+def iter_export_json(since=None):
+    """
+    The whole database as one compact JSON document, yielded in chunks.
+    Rows come off a server-side cursor (yield_per) so memory stays flat
+    whatever the row count. Same shape as before: {"goal": [...], ...}.
+
+    With since (a naive UTC datetime) only rows changed after it are
+    exported, plus tombstones for rows deleted after it. A leading
+    "delta" entry carries the window so the importer upserts instead of
+    replacing, and so the next sync can start from its "until" — plus this
+    database's WFM_SYNC_NAME, which the importer checks (one-way sync).
+    """
+    yield '{'
+    first_table = True
+    if since is not None:
+        window = {'since': since.isoformat(), 'until': datetime.utcnow().isoformat(), 'source': sync_name()}
+        yield '"delta":[' + json.dumps(window) + ']'
+        first_table = False
+
+    for table, model in exportable_models().items():
+        yield ('' if first_table else ',') + json.dumps(table) + ':['
+        first_table = False
+        query = select(model).order_by(model.id)
+        if since is not None and change_column(model) is not None:
+            query = query.where(change_column(model) > since)
+        rows = db.session.execute(
+            query.execution_options(yield_per=EXPORT_CHUNK_ROWS)
+        ).scalars()
+        first = True
+        for partition in rows.partitions():
+            # Every column (not the trimmed API to_dict) so updated_at / rank survive
+            chunk = ','.join(
+                json.dumps(ExportableMixin.to_dict(row), separators=(',', ':')) for row in partition
+            )
+            yield ('' if first else ',') + chunk
+            first = False
+            for row in partition:
+                db.session.expunge(row)  # don't let the identity map grow with the export
+        yield ']'
+    yield '}'
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a stream of str chunks on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 → gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# IMPORT
+# ──────────────────────────────────────────────────────────────────────────────
+class _JSONStreamReader:
+    """Pull-parser over a text stream — only the current row is ever decoded in memory."""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        data = self.fp.read(READ_CHUNK_CHARS)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace char (not consumed), '' at end of input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars):
+        c = self.peek()
+        if c not in chars:
+            raise ValueError(f"Malformed JSON: expected {chars!r}, got {c!r}")
+        self.pos += 1
+        return c
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                self.pos = end
+                return obj
+            except json.JSONDecodeError:
+                if not self._fill():  # truncated row → read more; at EOF it's really broken
+                    raise
+
+
+def iter_json_tables(fp):
+    """
+    Incrementally parse {"table": [row, ...], ...} from a binary or text file,
+    yielding (table, row) one row at a time.
+    """
+    if not isinstance(fp, io.TextIOBase):
+        fp = io.TextIOWrapper(fp, encoding='utf-8')
+    reader = _JSONStreamReader(fp)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        table = reader.value()
+        reader.expect(':')
+        reader.expect('[')
+        if reader.peek() != ']':
+            while True:
+                yield table, reader.value()
+                if reader.expect(',]') == ']':
+                    break
+        else:
+            reader.expect(']')
+        if reader.expect(',}') == '}':
+            return
+
+
+def _parse(value, parse):
+    try:
+        return parse(value) if value else None
+    except ValueError:
+        return None
+
+
+def _clean_row(model, table, row, columns):
+    """Exported dict → insertable dict: ISO strings back to date/time, enums, statuses."""
+    row = {k: v for k, v in row.items() if k in columns}
+
+    for field in ('due_date', 'start_date', 'end_date', 'date'):
+        if field in row:
+            row[field] = _parse(row[field], lambda v: date.fromisoformat(v[:10]))
+    for field in ('start_time', 'end_time'):
+        if field in row:
+            row[field] = _parse(row[field], time.fromisoformat)
+    for field in ('created_at', 'updated_at', 'deleted_at'):
+        if row.get(field):
+            row[field] = _parse(
+                row[field], lambda v: datetime.fromisoformat(v.replace('Z', '+00:00'))
+            ) or datetime.utcnow()
+
+    if table == 'task' and 'status' in row:
+        # API exports carry the value ('done'), raw SQLite dumps the name ('DONE')
+        try:
+            row['status'] = TaskStatus(row['status'])
+        except ValueError:
+            row['status'] = TaskStatus.__members__.get(row['status'], TaskStatus.TODO)
+    if table == 'goal' and 'status' in row:
+        row['status'] = row['status'] if row['status'] in GOAL_STATUSES else 'todo'
+
+    return row
+
+
+def _reset_id_sequence(model):
+    """Explicit ids were inserted — move the Postgres serial past them (SQLite needs nothing)."""
+    if db.engine.dialect.name == 'postgresql':
+        table = model.__tablename__
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+        ))
+
+
+def record_tombstones(table_name, row_ids):
+    """Remember deleted ids (one bulk INSERT) so delta exports can replay them."""
+    row_ids = list(row_ids)
+    if row_ids:
+        db.session.execute(insert(Tombstone), [
+            {'table_name': table_name, 'row_id': row_id} for row_id in row_ids
+        ])
+
+
+def _upsert_batch(model, rows):
+    """
+    Delta import: one SELECT for the batch's ids, then a bulk INSERT for new
+    rows and a bulk UPDATE for the rest. Deltas only come from the primary,
+    so its copy always wins — a newer local updated_at does not block it.
+    Returns the ids written.
+    """
+    ids = [row['id'] for row in rows]
+    existing = {
+        row_id for (row_id,) in
+        db.session.query(model.id).filter(model.id.in_(ids)).all()
+    }
+    inserts = [row for row in rows if row['id'] not in existing]
+    updates = [row for row in rows if row['id'] in existing]
+    if inserts:
+        db.session.execute(insert(model), inserts)
+    if updates:
+        db.session.execute(update(model), updates)
+    return [row['id'] for row in inserts + updates]
+
+
+def _apply_tombstones(rows, models):
+    """Delta import: replay deletes — one DELETE per table."""
+    by_table = {}
+    for row in rows:
+        by_table.setdefault(row['table_name'], []).append(row['row_id'])
+    deleted = 0
+    for table, row_ids in by_table.items():
+        model = models.get(table)
+        if model is None or model is Tombstone:
+            continue
+        result = db.session.execute(
+            delete(model).where(model.id.in_(row_ids)),
+            execution_options={'synchronize_session': False}
+        )
+        deleted += max(result.rowcount, 0)
+    return deleted
+
+
+def import_json_stream(fp):
+    """
+    Load an /export-json document with batched executemany statements. Rows
+    keep their exported ids so the same row can be matched on a later delta.
+
+    Full export → every table present is replaced.
+    Delta export (leading "delta" entry) → changed rows are upserted by id
+    (the primary is authoritative, so they always overwrite the local copy)
+    and tombstones delete rows. Only deltas from WFM_SYNC_PRIMARY are
+    accepted (SyncSourceError otherwise).
+
+    Goal hierarchy survives without a flush per row: goals go in parentless,
+    then one bulk UPDATE restores parent_id. Caller commits.
+    Returns {table: rows written}.
+    """
+    from .goal_tree import rebuild_goal_paths
+
+    models = exportable_models()
+    counts = {}
+    delta = False
+    batch, batch_model = [], None
+    goal_parents = {}   # id → (exported parent_id, updated_at) for every goal row read
+    reparent_ids = []   # goal ids actually written
+
+    def flush_batch():
+        if not batch:
+            return
+        table = batch_model.__tablename__
+        if delta and batch_model is Tombstone:
+            counts[table] += _apply_tombstones(batch, models)
+        else:
+            if delta:
+                written = _upsert_batch(batch_model, batch)
+            else:
+                db.session.execute(insert(batch_model), batch)
+                written = [row['id'] for row in batch]
+            counts[table] += len(written)
+            if batch_model is Goal:
+                reparent_ids.extend(written)
+        batch.clear()
+
+    for table, row in iter_json_tables(fp):
+        if table == 'delta':
+            if counts:
+                raise ValueError('"delta" must come before any table')
+            check_delta_source(row)
+            delta = True
+            continue
+
+        model = models.get(table)
+        if model is None:
+            continue
+
+        if table not in counts:
+            flush_batch()
+            if not delta:
+                db.session.query(model).delete()  # full import: replace, don't merge
+            counts[table] = 0
+            batch_model = model
+            columns = set(model.__table__.columns.keys())
+
+        row = _clean_row(model, table, row, columns)
+        if row.get('id') is None:
+            raise ValueError(f"{table} rows need their exported id")
+        if model is Goal:
+            goal_parents[row['id']] = (row.pop('parent_id', None), row.get('updated_at'))
+            row['parent_id'] = None
+
+        batch.append(row)
+        if len(batch) >= IMPORT_BATCH_ROWS:
+            flush_batch()
+
+    flush_batch()
+
+    if reparent_ids:
+        # === REBUILD THE FAMILY TREE — ONE BULK UPDATE, BROTHER! ===
+        wanted = {goal_parents[g][0] for g in reparent_ids} - {None}
+        present = {
+            goal_id for (goal_id,) in
+            db.session.query(Goal.id).filter(Goal.id.in_(wanted)).all()
+        } if wanted else set()
+        reparents = []
+        for goal_id in reparent_ids:
+            parent_id, updated_at = goal_parents[goal_id]
+            fix = {'id': goal_id, 'parent_id': parent_id if parent_id in present else None}
+            if updated_at is not None:
+                fix['updated_at'] = updated_at  # keep the source stamp, not "now"
+            reparents.append(fix)
+        db.session.execute(update(Goal), reparents)
+    if 'goal' in counts:
+        rebuild_goal_paths()
+
+    for table in counts:
+        _reset_id_sequence(models[table])
+
+    return counts
@@ -0,0 +1,52 @@
+# benchmarks/bench_calendar_window.py
+# Calendar import: 30 one-day /api/import-calendar requests vs one 30-day
+# window request, on a generated feed (5,000 one-offs, 600 weekly series)
+# served from a local fake host. Both must store the same events; the
+# ranged request should write them with a single INSERT.
+import os
+from datetime import date, timedelta
+
+from common import AUTH, count_statements, make_app, make_feed, serve_feed, timer
+
+START = date(2026, 3, 1)
+DAYS = 30
+
+
+def stored_events(app):
+    from app import db
+    from app.models import Event
+    with app.app_context():
+        rows = {(e.source_uid, e.start_date, e.start_time) for e in Event.query}
+        db.session.query(Event).delete()
+        db.session.commit()
+    return rows
+
+
+def main():
+    os.environ['ICS_CALENDAR_URL'] = serve_feed(make_feed())
+    app, client = make_app()
+
+    # Fill the feed cache first so both runs measure import, not the download
+    client.get(f"/api/import-calendar/{START:%Y%m%d}", headers=AUTH)
+    stored_events(app)
+
+    with timer(f"{DAYS} x one-day requests"):
+        for i in range(DAYS):
+            response = client.get(f"/api/import-calendar/{START + timedelta(days=i):%Y%m%d}", headers=AUTH)
+            assert response.status_code == 200, response.status_code
+    by_day = stored_events(app)
+
+    end = START + timedelta(days=DAYS - 1)
+    with count_statements(app) as statements, timer(f"one {DAYS}-day window request"):
+        response = client.get(f"/api/import-calendar/{START:%Y%m%d}/{end:%Y%m%d}", headers=AUTH)
+    assert response.status_code == 200, response.status_code
+    ranged = stored_events(app)
+    inserts = [s for s in statements if s.lstrip().upper().startswith('INSERT')]
+
+    print(f"{'events (day by day / window)':<45} {len(by_day):,} / {len(ranged):,}")
+    print(f"{'INSERT statements in the window request':<45} {len(inserts):8d}")
+    assert by_day == ranged, 'day-by-day and ranged imports disagree'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_day_board.py
+# Day board on a 1M-row task table, 99.8% DONE spread over ~7 years:
+# EXPLAIN QUERY PLAN of day_board_statement for today / a past day / a future
+# day, before and after ANALYZE (every branch must stay an index SEARCH), and
+# load_day_board timed against the old OR query + separate backlog query,
+# with and without ix_task_status_date_rank.
+import random
+from datetime import date, timedelta
+
+from common import make_app, timer
+
+from sqlalchemy import and_, case, insert, or_, text
+
+ROWS = 1_000_000
+BATCH = 50_000
+
+
+def seed(db, today):
+    from app.models import Task, TaskStatus
+    rnd = random.Random(21)
+    open_statuses = [TaskStatus.TODO, TaskStatus.IN_PROGRESS, TaskStatus.BLOCKED, TaskStatus.BACKLOG]
+    rows = []
+    for i in range(ROWS):
+        status = TaskStatus.DONE if rnd.random() < 0.998 else rnd.choice(open_statuses)
+        day = None if status == TaskStatus.BACKLOG else today - timedelta(days=rnd.randint(-30, 2500))
+        rows.append({'description': f"task {i}", 'date': day, 'status': status, 'rank': rnd.randint(0, 100)})
+        if len(rows) == BATCH:
+            db.session.execute(insert(Task), rows)
+            rows = []
+    db.session.commit()
+
+
+def show_plans(db, today, label):
+    from app.tasks import day_board_statement
+    for view, day in (('today', today), ('past', today - timedelta(days=10)), ('future', today + timedelta(days=3))):
+        sql = str(day_board_statement(day, today).compile(db.engine, compile_kwargs={'literal_binds': True}))
+        plan = [row[-1] for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+        print(f"plan {label}, {view}:")
+        for line in plan:
+            print('   ', line)
+        assert not any(line.startswith('SCAN task') for line in plan), f"{view} board scans the task table"
+
+
+def old_board(today):
+    """The two queries the day page ran before load_day_board."""
+    from app.models import Task, TaskStatus
+    day = Task.query.filter(or_(
+        Task.status.in_([TaskStatus.IN_PROGRESS, TaskStatus.BLOCKED]),
+        and_(Task.status == TaskStatus.TODO, Task.date <= today),
+        and_(Task.status == TaskStatus.DONE, Task.date == today),
+    )).order_by(case((Task.status != TaskStatus.DONE, 0), else_=1), Task.id).order_by(Task.rank.asc(), Task.id.asc()).all()
+    backlog = Task.query.filter(Task.status == TaskStatus.BACKLOG).order_by(Task.rank.asc(), Task.id.asc()).all()
+    return day, backlog
+
+
+def main():
+    from app import db
+    from app.tasks import load_day_board
+
+    today = date.today()
+    app, _ = make_app()
+    with app.app_context():
+        with timer(f"seed {ROWS:,} tasks"):
+            seed(db, today)
+
+        show_plans(db, today, 'before ANALYZE')
+        for view, day in (('today', today), ('past', today - timedelta(days=10)), ('future', today + timedelta(days=3))):
+            db.session.expunge_all()
+            with timer(f"load_day_board, {view}"):
+                board, backlog = load_day_board(day, today)
+            print(f"{'  day / backlog tasks':<45} {len(board):,} / {len(backlog):,}")
+
+        db.session.execute(text('ANALYZE'))
+        show_plans(db, today, 'after ANALYZE')
+        db.session.expunge_all()
+        with timer('load_day_board, today, after ANALYZE'):
+            load_day_board(today, today)
+
+        db.session.expunge_all()
+        with timer('old OR + backlog queries, index present'):
+            board, backlog = old_board(today)
+        print(f"{'  day / backlog tasks':<45} {len(board):,} / {len(backlog):,}")
+        db.session.execute(text('DROP INDEX ix_task_status_date_rank'))
+        db.session.expunge_all()
+        with timer('old OR + backlog queries, no index'):
+            old_board(today)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_goal_forest.py
+# /goals on a 5-level goal forest: the SQL statement count must stay the same
+# as the tree grows (one forest query, no lazy loads from the template's
+# recursive goal.children walk). Renders at ~3.4k goals, then again after
+# growing the forest to ~11k.
+import random
+from datetime import date, timedelta
+
+from common import AUTH, count_statements, make_app, timer
+
+from sqlalchemy import insert
+
+SMALL = [10, 4, 4, 4, 4]    # 3,410 goals
+LARGE = [10, 5, 5, 5, 5]    # +7,810 goals
+
+
+def add_forest(next_id, fanout, rnd):
+    rows, level = [], [None]
+    for fan in fanout:
+        children = []
+        for parent in level:
+            for _ in range(fan):
+                due = rnd.choice([None, date(2026, 1, 1) + timedelta(days=rnd.randrange(300))])
+                rows.append({'id': next_id, 'title': f"goal {next_id}", 'description': '',
+                             'parent_id': parent, 'due_date': due, 'rank': rnd.randrange(5)})
+                children.append(next_id)
+                next_id += 1
+        level = children
+    return rows, next_id
+
+
+def main():
+    from app import db
+    from app.goal_tree import rebuild_goal_paths
+    from app.models import Goal
+
+    app, client = make_app()
+    rnd = random.Random(8)
+    next_id = 1
+    counts = []
+    for fanout in (SMALL, LARGE):
+        with app.app_context():
+            rows, next_id = add_forest(next_id, fanout, rnd)
+            db.session.execute(insert(Goal), rows)
+            rebuild_goal_paths()
+            db.session.commit()
+            total = db.session.query(Goal).count()
+        with count_statements(app) as statements, timer(f"GET /goals with {total:,} goals"):
+            response = client.get('/goals', headers=AUTH)
+        assert response.status_code == 200, response.status_code
+        print(f"{'  statements':<45} {len(statements):8d}")
+        print(f"{'  page size':<45} {len(response.data) / 1e6:7.1f}M")
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1], f"/goals statement count grew with the tree: {counts}"
+
+
+if __name__ == '__main__':
+    main()
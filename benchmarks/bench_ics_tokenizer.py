@@ -0,0 +1,84 @@
+# benchmarks/bench_ics_tokenizer.py
+# ICS tokenizing: a ~14MB generated feed (40,000 one-offs, 2,000 weekly
+# series) parsed the old way — whole text in memory, split('\n'), regex
+# parameter split, kept below as old_vevents — vs app.ics_tokenizer streaming
+# the file in chunks. Both feed the same parse_vevent, so the difference is
+# the tokenizer alone. Reports time and tracemalloc peak.
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+from common import make_feed
+
+_PARAM_RE = re.compile(r';([^=;]+)=([^;]+)')
+
+
+def old_vevents(text):
+    """The pre-tokenizer path: unfold a fully loaded feed line by line."""
+    block = current = None
+    for raw in text.replace('\r\n', '\n').split('\n'):
+        raw = raw.rstrip()
+        if raw.startswith((' ', '\t')):
+            if current is not None:
+                current += raw[1:].lstrip()
+            continue
+        if current == 'BEGIN:VEVENT':
+            block = defaultdict(list)
+        elif current == 'END:VEVENT':
+            if block is not None:
+                yield dict(block)
+            block = None
+        elif block is not None and current and ':' in current:
+            key_part, value = current.split(':', 1)
+            key = key_part.split(';')[0]
+            params = {m.group(1): m.group(2) for m in _PARAM_RE.finditer(key_part[len(key):])}
+            block[key].append((params, value))
+        current = raw
+
+
+def measure(label, events):
+    """Parses every event without keeping them, so the peak is the tokenizer's own."""
+    tracemalloc.start()
+    count = sum(1 for _ in events())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()   # timed again without tracemalloc slowing it down
+    sum(1 for _ in events())
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {elapsed:8.3f}s  peak {peak / 1e6:6.1f}MB")
+    return count
+
+
+def main():
+    from app.calendar_import import parse_vevent
+    from app.ics_tokenizer import iter_file_chunks, iter_vevents
+
+    fd, path = tempfile.mkstemp(suffix='.ics')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(make_feed(singles=40_000, weekly=2_000))
+    try:
+        def old():
+            with open(path, encoding='utf-8', newline='') as f:
+                text = f.read()   # what response.text used to hand the parser
+            for props in old_vevents(text):
+                yield parse_vevent(props)
+
+        def new():
+            with open(path, 'rb') as f:
+                for props in iter_vevents(iter_file_chunks(f)):
+                    yield parse_vevent(props)
+
+        print(f"{'feed size':<45} {os.path.getsize(path) / 1e6:7.1f}M")
+        before = measure('old split-based parser', old)
+        after = measure('streaming tokenizer', new)
+        print(f"{'events (old / new)':<45} {before:,} / {after:,}")
+        assert before == after and all(a == b for a, b in zip(old(), new())), 'tokenizers disagree'
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_import_json.py
+# /import-json throughput: seed ~105k rows, export them, re-import the
+# export (plain and gzipped) and report rows/sec. Also checks the round trip
+# export → import → export gives back the same rows.
+import gzip
+import io
+import json
+from datetime import date, time
+
+from common import AUTH, make_app, timer
+
+from sqlalchemy import insert
+
+TASKS = 100_000
+GOALS = 5_000
+
+
+def seed(db):
+    from app.goal_tree import rebuild_goal_paths
+    from app.models import Event, Goal, Note, Task, TaskStatus
+
+    db.session.execute(insert(Task), [
+        {'description': f"task {i}", 'status': TaskStatus.DONE, 'date': date(2026, 1, 1),
+         'rank': i, 'notes': 'é' * 50}
+        for i in range(TASKS)
+    ])
+    db.session.execute(insert(Goal), [{'id': 1, 'title': 'root', 'description': 'x'}] + [
+        {'id': i, 'title': f"goal {i}", 'description': 'x', 'parent_id': i // 2, 'due_date': date(2026, 2, 1)}
+        for i in range(2, GOALS + 1)
+    ])
+    rebuild_goal_paths()
+    db.session.add(Event(title='event', start_date=date(2026, 1, 1), end_date=date(2026, 1, 2),
+                         start_time=time(9, 30), end_time=time(10)))
+    db.session.add(Note(scope='day', year=2026, month=1, day=1, type='prep', content='hi'))
+    db.session.commit()
+
+
+def without_ids(rows):
+    return [{k: v for k, v in row.items() if k != 'id'} for row in rows]
+
+
+def main():
+    from app import db
+
+    app, client = make_app()
+    with app.app_context():
+        seed(db)
+
+    before = client.get('/export-json', headers=AUTH)
+    raw = before.data
+    exported = json.loads(raw)
+    rows = sum(len(v) for v in exported.values() if isinstance(v, list))
+    print(f"{'export size':<45} {len(raw) / 1e6:7.1f}M, {rows:,} rows")
+
+    for label, payload, name in (('plain', raw, 'export.json'),
+                                 ('gzip', gzip.compress(raw), 'export.json.gz')):
+        results = {}
+        with timer(f"POST /import-json ({label})", results):
+            response = client.post('/import-json', headers=AUTH, content_type='multipart/form-data',
+                                   data={'file': (io.BytesIO(payload), name)})
+        assert response.status_code < 400, response.status_code
+        print(f"{'  rows/sec':<45} {rows / results[f'POST /import-json ({label})']:8.0f}")
+
+        after = json.loads(client.get('/export-json', headers=AUTH).data)
+        for table, table_rows in exported.items():
+            if isinstance(table_rows, list):
+                assert without_ids(table_rows) == without_ids(after[table]), f"{table} changed in the round trip"
+        assert exported['goal'] == after['goal'], 'goal ids/parents changed in the round trip'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_note_keys.py
+# Note addressing: parse 100k distinct note keys, then look every one of them
+# up the way GET /api/note/<key> does (ORM query per key, so that part mostly
+# measures per-request overhead; half the keys have a note, half miss). Also
+# checks the lookup's query plan is a SEARCH on uix_note over all nine key
+# columns — that unique index is the lookup index, there is no second one.
+from common import make_app, timer
+
+from sqlalchemy import insert, text
+
+KEYS = 100_000
+
+
+def note_keys():
+    keys = []
+    for month in range(1, 13):
+        for day in range(1, 29):
+            for hour in range(24):
+                for index in range(13):
+                    keys.append(f"note-day-2026-{month}-{day}-notes-{hour:02d}:00-{index}")
+    return keys[:KEYS]
+
+
+def main():
+    from app import db
+    from app.models import Note
+    from app.notes import address_filter, parse_note_key
+
+    keys = note_keys()
+    app, _ = make_app()
+
+    parse_note_key.cache_clear()
+    with timer(f"parse {len(keys):,} distinct keys (cold cache)"):
+        addresses = [parse_note_key(k) for k in keys]
+    assert all(addresses)
+    hot = keys[:4000]   # one page's worth of keys, parsed over and over
+    with timer(f"parse {len(hot) * 25:,} keys (hot cache)"):
+        for _ in range(25):
+            for k in hot:
+                parse_note_key(k)
+
+    with app.app_context():
+        # Every other key gets a note, so half the lookups hit and half miss
+        db.session.execute(insert(Note), [
+            dict(a._asdict(), content=f"note {i}") for i, a in enumerate(addresses) if i % 2 == 0
+        ])
+        db.session.commit()
+
+        found = 0
+        with timer(f"look up {len(keys):,} keys (GET /api/note path)"):
+            for k in keys:
+                row = db.session.query(Note.content, Note.completed).filter(
+                    address_filter(parse_note_key(k))
+                ).first()
+                found += row is not None
+        print(f"{'found':<45} {found:,}")
+        assert found == (len(keys) + 1) // 2, 'expected every other key to have a note'
+
+        lookup = db.session.query(Note.content, Note.completed).filter(address_filter(addresses[0]))
+        sql = str(lookup.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+        plan = [row[-1] for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+        for line in plan:
+            print('plan:', line)
+        assert any('sqlite_autoindex_note_1' in line and 'type=?' in line for line in plan), \
+            'note lookup is not a full-key search on uix_note'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_recurrence.py
+# Recurring-series expansion: 500 weekly series running 2022-2029, each with
+# 30 EXDATEs, asked for one day at a time over 30 days (15,000 lookups).
+# Compares the pre-compile approach (rrulestr per lookup + EXDATE scan, kept
+# below as old_lookups) with app.recurrence.compile_series, cold and warm.
+# The old path takes ~30s; all three must find the same instances.
+from datetime import date, datetime, timedelta
+
+from common import timer
+
+from dateutil.rrule import rrulestr
+
+SERIES = 500
+DAYS = 30
+TZID = 'Central Standard Time'
+
+
+def make_series(parse_dt):
+    base = datetime(2022, 1, 3, 8)
+    series = []
+    for i in range(SERIES):
+        start = base + timedelta(days=i % 7, hours=i % 9)
+        exdates = [parse_dt(f"{start + timedelta(days=7 * k):%Y%m%dT%H%M%S}", TZID) for k in range(5, 300, 10)]
+        series.append((f"weekly-{i}", 'FREQ=WEEKLY;UNTIL=20291231T000000Z',
+                       parse_dt(f"{start:%Y%m%dT%H%M%S}", TZID), tuple(exdates)))
+    return series
+
+
+def old_lookups(series, days, to_date):
+    found = 0
+    for day in days:
+        for uid, rule, start, exdates in series:
+            window = datetime.combine(day, datetime.min.time()).replace(tzinfo=start.tzinfo)
+            for instance in rrulestr(rule, dtstart=start).between(window, window + timedelta(days=1)):
+                if any(to_date(e) == instance.date() for e in exdates):
+                    continue
+                found += 1
+    return found
+
+
+def new_lookups(series, days, compile_series):
+    found = 0
+    for day in days:
+        window = datetime.combine(day, datetime.min.time())
+        for uid, rule, start, exdates in series:
+            found += len(compile_series(uid, rule, start, exdates).between(window, window + timedelta(days=1)))
+    return found
+
+
+def main():
+    from app.calendar_import import parse_dt, to_date
+    from app.recurrence import clear_cache, compile_series
+
+    series = make_series(parse_dt)
+    days = [date(2026, 6, 1) + timedelta(days=i) for i in range(DAYS)]
+    lookups = f"{SERIES * DAYS:,} lookups"
+
+    with timer(f"old rrulestr + EXDATE scan, {lookups}"):
+        old = old_lookups(series, days, to_date)
+    clear_cache()
+    with timer(f"compiled, cold cache, {lookups}"):
+        cold = new_lookups(series, days, compile_series)
+    with timer(f"compiled, warm cache, {lookups}"):
+        warm = new_lookups(series, days, compile_series)
+
+    print(f"{'instances (old / cold / warm)':<45} {old:,} / {cold:,} / {warm:,}")
+    assert old == cold == warm, 'compiled series disagree with rrulestr'
+
+
+if __name__ == '__main__':
+    main()
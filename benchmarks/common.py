@@ -0,0 +1,111 @@
+# benchmarks/common.py
+# Shared setup for the scripts in this folder. Every benchmark runs against a
+# throwaway SQLite file in a temp dir — never instance/wfm_planner.db.
+# Run from the repo root:  python benchmarks/<script>.py
+import base64
+import hashlib
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'bench'
+AUTH = {'Authorization': 'Basic ' + base64.b64encode(f'admin:{PASSWORD}'.encode()).decode()}
+
+
+def make_app():
+    """(app, client) on a fresh temp database; the ICS cache and backups stay in the temp dir too."""
+    workdir = tempfile.mkdtemp(prefix='wfm-bench-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    os.environ['WFM_PASSWORD'] = PASSWORD
+    from app import create_app
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    app.instance_path = workdir
+    return app, app.test_client()
+
+
+@contextmanager
+def count_statements(app):
+    """with count_statements(app) as statements: ... → every SQL statement run inside."""
+    from sqlalchemy import event
+    from app import db
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+@contextmanager
+def timer(label, results=None):
+    """Prints (and optionally records) how long the block took."""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    if results is not None:
+        results[label] = elapsed
+    print(f"{label:<45} {elapsed:8.3f}s")
+
+
+def make_feed(singles=5000, weekly=600, until='20281231T000000Z'):
+    """A generated Outlook-style feed: one-off meetings spread over ~400 days plus weekly series with an EXDATE."""
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0']
+    base = datetime(2026, 1, 5, 9, 0)
+    stamp = '20260101T000000Z'
+    for i in range(singles):
+        start = base + timedelta(days=i % 400, hours=i % 8)
+        lines += ['BEGIN:VEVENT', f"UID:single-{i}", f"DTSTAMP:{stamp}", 'SEQUENCE:0',
+                  f"DTSTART;TZID=Central Standard Time:{start:%Y%m%dT%H%M%S}",
+                  f"DTEND;TZID=Central Standard Time:{start + timedelta(hours=1):%Y%m%dT%H%M%S}",
+                  f"SUMMARY:Single {i}",
+                  'DESCRIPTION:A long description that goes on and on and on and on and on and on and o',
+                  ' n and wraps around the seventy five octet limit', 'END:VEVENT']
+    for i in range(weekly):
+        start = base + timedelta(days=i % 7, hours=8 + i % 9)
+        lines += ['BEGIN:VEVENT', f"UID:weekly-{i}", f"DTSTAMP:{stamp}",
+                  f"DTSTART;TZID=Central Standard Time:{start:%Y%m%dT%H%M%S}",
+                  f"DTEND;TZID=Central Standard Time:{start + timedelta(minutes=30):%Y%m%dT%H%M%S}",
+                  f"RRULE:FREQ=WEEKLY;INTERVAL=1;UNTIL={until}",
+                  f"EXDATE;TZID=Central Standard Time:{start + timedelta(days=14):%Y%m%dT%H%M%S}",
+                  f"SUMMARY:Weekly {i}", 'END:VEVENT']
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(lines).encode()
+
+
+def serve_feed(body):
+    """Serves body over local HTTP with an ETag (and 304s); returns its URL."""
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'text/calendar')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{httpd.server_address[1]}/calendar.ics"
@@ -1,16 +1,35 @@
 # export_db.py
+# Usage: python export_db.py                 → full export
+#        python export_db.py 2026-10-01T00:00 → delta: rows changed (UTC) after that
+#        (deltas are one-way: run with WFM_SYNC_NAME set to this database's sync name)
+import os
 import sqlite3
+import sys
 import json
 from datetime import date, datetime
 
+since = sys.argv[1] if len(sys.argv) > 1 else None
+
 conn = sqlite3.connect('instance/wfm_planner.db')
 cur = conn.cursor()
 
-tables = ['goal', 'note', 'event', 'task']
+tables = ['goal', 'note', 'event', 'task', 'tombstone']
+change_columns = {'goal': 'updated_at', 'note': 'updated_at', 'event': 'updated_at',
+                  'task': 'updated_at', 'tombstone': 'deleted_at'}
 
 data = {}
+if since:
+    # SQLite stores DateTime as 'YYYY-MM-DD HH:MM:SS.ffffff' — compare in that form
+    since = datetime.fromisoformat(since).isoformat(sep=' ')
+    # 'source' — the importer only takes deltas from its WFM_SYNC_PRIMARY (one-way sync)
+    data['delta'] = [{'since': since, 'until': datetime.utcnow().isoformat(),
+                      'source': os.getenv('WFM_SYNC_NAME')}]
+
 for table in tables:
-    cur.execute(f"SELECT * FROM {table}")
+    if since:
+        cur.execute(f"SELECT * FROM {table} WHERE {change_columns[table]} > ? ORDER BY id", (since,))
+    else:
+        cur.execute(f"SELECT * FROM {table} ORDER BY id")
     columns = [desc[0] for desc in cur.description]
     rows = []
     for row in cur.fetchall():
@@ -25,4 +44,4 @@ for table in tables:
 with open('local_db.json', 'w') as f:
     json.dump(data, f, indent=2)
 
-print("Exported to local_db.json")
\ No newline at end of file
+print(f"Exported to local_db.json{' (delta since ' + since + ')' if since else ''}")
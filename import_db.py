@@ -1,37 +1,15 @@
 # import_db.py
-import json
-import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.models import Goal, Note, Event, Task
-from datetime import datetime, date
+# Loads local_db.json into DATABASE_URL (e.g. Render Postgres) with the same
+# engine as /import-json: full export → tables replaced, delta → rows upserted
+# by id and tombstoned rows deleted.
+from app import create_app, db
+from app.transfer import import_json_stream
 
-# Connect to Render DB
-engine = create_engine(os.environ['DATABASE_URL'])
-Session = sessionmaker(bind=engine)
-session = Session()
+app = create_app()
 
-# Load JSON
-with open('local_db.json') as f:
-    data = json.load(f)
+with app.app_context():
+    with open('local_db.json', 'rb') as f:
+        counts = import_json_stream(f)
+    db.session.commit()
 
-# Import each table — IGNORE 'id' FIELD
-for table, rows in data.items():
-    Model = {'goal': Goal, 'note': Note, 'event': Event, 'task': Task}[table]
-    for row in rows:
-        # REMOVE 'id' — LET POSTGRES ASSIGN IT
-        row.pop('id', None)  # <-- THIS IS THE ELBOW DROP
-
-        # Fix date/time fields
-        for k, v in row.items():
-            if v and 'date' in k:
-                row[k] = datetime.fromisoformat(v).date()
-            elif v and 'time' in k:
-                clean_time = v.split('.')[0]  # "08:30:00.000000" → "08:30:00"
-                row[k] = datetime.strptime(clean_time, '%H:%M:%S').time()
-
-        obj = Model(**row)
-        session.add(obj)
-    session.commit()
-
-print("All data imported safely — IDs auto-assigned by Postgres!")
\ No newline at end of file
+print(f"All data imported safely — {counts}")
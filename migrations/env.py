@@ -11,7 +11,10 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-fileConfig(config.config_file_name)
+# (No file when the app itself runs migrations — see backup.upgrade_staged —
+# and then the app's logging must be left alone.)
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
 logger = logging.getLogger('alembic.env')
 
 
@@ -94,9 +97,7 @@ def run_migrations_online():
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
 
-    connectable = get_engine()
-
-    with connectable.connect() as connection:
+    def run(connection):
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -106,6 +107,17 @@ def run_migrations_online():
         with context.begin_transaction():
             context.run_migrations()
 
+    # A connection handed in by the caller (a staged restore) instead of the app's DB
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        run(connection)
+        return
+
+    connectable = get_engine()
+
+    with connectable.connect() as connection:
+        run(connection)
+
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,60 @@
+"""goal materialized depth and path
+
+Revision ID: 8b7e4d2c1a55
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b7e4d2c1a55'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so a fresh DB may already have these
+    inspector = sa.inspect(op.get_bind())
+    columns = {c['name'] for c in inspector.get_columns('goal')}
+    indexes = {ix['name'] for ix in inspector.get_indexes('goal')}
+
+    with op.batch_alter_table('goal') as batch_op:
+        if 'depth' not in columns:
+            batch_op.add_column(sa.Column('depth', sa.Integer(), nullable=False, server_default='0'))
+        if 'path' not in columns:
+            batch_op.add_column(sa.Column('path', sa.String(length=255), nullable=True))
+
+    if 'ix_goal_depth' not in indexes:
+        op.create_index('ix_goal_depth', 'goal', ['depth'], unique=False)
+    if 'ix_goal_path' not in indexes:
+        op.create_index('ix_goal_path', 'goal', ['path'], unique=False,
+                        postgresql_ops={'path': 'varchar_pattern_ops'})
+
+    if 'path' not in columns:
+        # Existing rows get depth/path here (same result as `flask backfill-goal-paths`),
+        # so an upgraded DB — or a restored older backup — is usable straight away
+        op.execute(sa.text("""
+            WITH RECURSIVE tree(id, depth, path) AS (
+                SELECT id, 0, '/' || CAST(id AS VARCHAR) || '/' FROM goal
+                WHERE parent_id IS NULL OR parent_id NOT IN (SELECT id FROM goal)
+                UNION ALL
+                SELECT goal.id, tree.depth + 1, tree.path || CAST(goal.id AS VARCHAR) || '/'
+                FROM goal JOIN tree ON goal.parent_id = tree.id
+            )
+            UPDATE goal SET
+                depth = (SELECT depth FROM tree WHERE tree.id = goal.id),
+                path = (SELECT path FROM tree WHERE tree.id = goal.id)
+            WHERE id IN (SELECT id FROM tree)
+        """))
+
+
+def downgrade():
+    op.drop_index('ix_goal_path', table_name='goal')
+    op.drop_index('ix_goal_depth', table_name='goal')
+    with op.batch_alter_table('goal') as batch_op:
+        batch_op.drop_column('path')
+        batch_op.drop_column('depth')
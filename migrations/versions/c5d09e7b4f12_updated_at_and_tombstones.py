@@ -0,0 +1,56 @@
+"""updated_at change tracking and tombstones for delta sync
+
+Revision ID: c5d09e7b4f12
+Revises: 8b7e4d2c1a55
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d09e7b4f12'
+down_revision = '8b7e4d2c1a55'
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ('goal', 'task', 'event', 'note')
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so a fresh DB may already have these
+    inspector = sa.inspect(op.get_bind())
+
+    for table in TRACKED_TABLES:
+        columns = {c['name'] for c in inspector.get_columns(table)}
+        indexes = {ix['name'] for ix in inspector.get_indexes(table)}
+        if 'updated_at' not in columns:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+            # Existing rows count as changed "now" — the first delta after upgrading includes them
+            op.execute(sa.text(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP"))
+        if f'ix_{table}_updated_at' not in indexes:
+            op.create_index(f'ix_{table}_updated_at', table, ['updated_at'], unique=False)
+
+    if 'tombstone' not in inspector.get_table_names():
+        op.create_table(
+            'tombstone',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('table_name', sa.String(length=20), nullable=False),
+            sa.Column('row_id', sa.Integer(), nullable=False),
+            sa.Column('deleted_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_tombstone_deleted_at', 'tombstone', ['deleted_at'], unique=False)
+    elif 'ix_tombstone_deleted_at' not in {ix['name'] for ix in inspector.get_indexes('tombstone')}:
+        op.create_index('ix_tombstone_deleted_at', 'tombstone', ['deleted_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tombstone_deleted_at', table_name='tombstone')
+    op.drop_table('tombstone')
+    for table in TRACKED_TABLES:
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
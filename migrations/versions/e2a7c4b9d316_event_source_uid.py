@@ -0,0 +1,38 @@
+"""calendar source UID / instance on event for idempotent imports
+
+Revision ID: e2a7c4b9d316
+Revises: c5d09e7b4f12
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a7c4b9d316'
+down_revision = 'c5d09e7b4f12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so a fresh DB may already have these
+    inspector = sa.inspect(op.get_bind())
+    columns = {c['name'] for c in inspector.get_columns('event')}
+    constraints = {uc['name'] for uc in inspector.get_unique_constraints('event')}
+
+    with op.batch_alter_table('event') as batch_op:
+        if 'source_uid' not in columns:
+            batch_op.add_column(sa.Column('source_uid', sa.String(length=255), nullable=True))
+        if 'source_instance' not in columns:
+            batch_op.add_column(sa.Column('source_instance', sa.String(length=32), nullable=True))
+        if 'uix_event_source' not in constraints:
+            batch_op.create_unique_constraint('uix_event_source', ['source_uid', 'source_instance'])
+
+
+def downgrade():
+    with op.batch_alter_table('event') as batch_op:
+        batch_op.drop_constraint('uix_event_source', type_='unique')
+        batch_op.drop_column('source_instance')
+        batch_op.drop_column('source_uid')
@@ -0,0 +1,27 @@
+"""composite (status, date, rank) index for the day board task query
+
+Revision ID: f4b8e1a6c920
+Revises: e2a7c4b9d316
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b8e1a6c920'
+down_revision = 'e2a7c4b9d316'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so a fresh DB may already have it
+    inspector = sa.inspect(op.get_bind())
+    if 'ix_task_status_date_rank' not in {ix['name'] for ix in inspector.get_indexes('task')}:
+        op.create_index('ix_task_status_date_rank', 'task', ['status', 'date', 'rank'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_task_status_date_rank', table_name='task')
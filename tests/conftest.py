@@ -0,0 +1,60 @@
+# tests/conftest.py
+import base64
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event as sa_event
+
+PASSWORD = 'test-password'
+AUTH = {'Authorization': 'Basic ' + base64.b64encode(f'admin:{PASSWORD}'.encode()).decode()}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """A fresh app on its own throwaway SQLite file."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv('WFM_PASSWORD', PASSWORD)
+    from app import create_app, db
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    app.instance_path = str(tmp_path)   # ICS cache, backups — never the real instance/
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth():
+    return dict(AUTH)
+
+
+@pytest.fixture
+def count_queries(app):
+    """
+    with count_queries() as statements: ...  → every SQL statement the block ran.
+    Hooks the engine's before_cursor_execute, so lazy loads count too.
+    """
+    from app import db
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        sa_event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            sa_event.remove(engine, 'before_cursor_execute', record)
+
+    return counter
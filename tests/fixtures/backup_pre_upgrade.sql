@@ -0,0 +1,69 @@
+-- A backup from before the sync/goal-path migrations: the baseline schema, built by its own create_all()
+BEGIN TRANSACTION;
+CREATE TABLE event (
+	id INTEGER NOT NULL,
+	title VARCHAR(100) NOT NULL,
+	start_date DATE NOT NULL,
+	end_date DATE NOT NULL,
+	start_time TIME,
+	end_time TIME,
+	is_recurring BOOLEAN,
+	recurrence_rule VARCHAR(50),
+	all_day BOOLEAN,
+	PRIMARY KEY (id)
+);
+INSERT INTO "event" VALUES(1,'standup','2025-12-30','2025-12-30',NULL,NULL,0,NULL,0);
+CREATE TABLE goal (
+	id INTEGER NOT NULL,
+	title VARCHAR(100) NOT NULL,
+	type VARCHAR(20),
+	description TEXT NOT NULL,
+	motivation TEXT,
+	due_date DATE,
+	completed BOOLEAN,
+	created_at DATETIME,
+	parent_id INTEGER,
+	status VARCHAR(20) DEFAULT 'todo' NOT NULL,
+	category VARCHAR(20),
+	rank INTEGER DEFAULT '0' NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(parent_id) REFERENCES goal (id)
+);
+INSERT INTO "goal" VALUES(1,'Ship 2026','annual','',NULL,NULL,0,'2026-10-18 13:49:19.515524',NULL,'todo',NULL,0);
+INSERT INTO "goal" VALUES(2,'Q1 launch','quarterly','',NULL,NULL,0,'2026-10-18 13:49:19.516750',1,'todo',NULL,0);
+INSERT INTO "goal" VALUES(3,'Jan beta','monthly','',NULL,NULL,0,'2026-10-18 13:49:19.518618',2,'todo',NULL,0);
+CREATE TABLE note (
+	id INTEGER NOT NULL,
+	scope VARCHAR(20) NOT NULL,
+	year INTEGER NOT NULL,
+	quarter INTEGER,
+	month INTEGER,
+	week INTEGER,
+	day INTEGER,
+	time VARCHAR(5),
+	"index" INTEGER,
+	type VARCHAR(20) NOT NULL,
+	content TEXT,
+	completed BOOLEAN,
+	PRIMARY KEY (id),
+	CONSTRAINT uix_note UNIQUE (scope, year, quarter, month, week, day, time, "index", type)
+);
+INSERT INTO "note" VALUES(1,'day',2025,NULL,12,NULL,30,NULL,NULL,'prep','before the upgrade',0);
+CREATE TABLE task (
+	id INTEGER NOT NULL,
+	description VARCHAR(200) NOT NULL,
+	date DATE,
+	status VARCHAR(11) NOT NULL,
+	notes TEXT,
+	rank INTEGER DEFAULT '0' NOT NULL,
+	category VARCHAR(50),
+	PRIMARY KEY (id)
+);
+INSERT INTO "task" VALUES(1,'write changelog','2025-12-30','TODO',NULL,1,NULL);
+INSERT INTO "task" VALUES(2,'old thing','2025-12-01','DONE',NULL,2,NULL);
+CREATE INDEX ix_note_year ON note (year);
+CREATE INDEX ix_note_scope ON note (scope);
+CREATE INDEX ix_goal_rank ON goal (rank);
+CREATE INDEX ix_task_rank ON task (rank);
+CREATE INDEX ix_task_category ON task (category);
+COMMIT;
@@ -0,0 +1,171 @@
+# tests/test_calendar_feed.py
+import hashlib
+import http.server
+import os
+import threading
+from datetime import date
+
+import pytest
+
+from app.calendar_import import CalendarFeed
+from app.models import Event
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+class FakeICSServer:
+    """A local HTTP server playing the calendar host: ETag / Last-Modified, 304s, outages."""
+
+    def __init__(self):
+        self.body = b''
+        self.last_modified = 'Sun, 18 Oct 2026 12:00:00 GMT'
+        self.down = False
+        self.requests = []   # (status, If-None-Match, If-Modified-Since)
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if server.down:
+                    self.send_response(503)
+                    self.end_headers()
+                    server.requests.append((503, None, None))
+                    return
+                etag = '"' + hashlib.sha1(server.body).hexdigest() + '"'
+                conditional = (self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since'))
+                if conditional[0] == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    server.requests.append((304, *conditional))
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', server.last_modified)
+                self.send_header('Content-Type', 'text/calendar')
+                self.send_header('Content-Length', str(len(server.body)))
+                self.end_headers()
+                self.wfile.write(server.body)
+                server.requests.append((200, *conditional))
+
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/calendar.ics"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def serve(self, fixture):
+        self.body = _fixture(fixture)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def ics_server():
+    server = FakeICSServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def feed(ics_server, tmp_path):
+    return CalendarFeed(ics_server.url, str(tmp_path / 'ics_cache'))
+
+
+def _by_uid(events):
+    return {(e['UID'], e['RECURRENCE-ID'] is not None): e for e in events}
+
+
+def test_first_refresh_downloads_and_parses_every_vevent(ics_server, feed):
+    ics_server.serve('calendar.ics')
+    events, stats = feed.refresh()
+    assert stats == {'parsed': 6, 'reused': 0, 'removed': 0, 'feed': 'downloaded'}
+    assert ics_server.requests == [(200, None, None)]
+
+    events = _by_uid(events)
+    budget = events[('one-off-1', False)]
+    # Folded DESCRIPTION unfolded and unescaped; the VALARM's DESCRIPTION didn't overwrite it
+    assert budget['DESCRIPTION'] == 'Bring the Q4 numbers, the forecast and the long list of questions from last week'
+    # Trailing Z means UTC: 15:00Z is 10:00 Central (CDT)
+    call = events[('utc-call', False)]
+    assert call['DTSTART'].strftime('%Y-%m-%d %H:%M') == '2026-10-20 10:00'
+    assert events[('offsite', False)]['DTSTART'] == date(2026, 10, 22)
+
+
+def test_unchanged_feed_is_a_304_and_nothing_is_reparsed(ics_server, feed):
+    ics_server.serve('calendar.ics')
+    feed.refresh()
+    events, stats = feed.refresh()
+    assert stats == {'parsed': 0, 'reused': 6, 'removed': 0, 'feed': 'not_modified'}
+    status, etag, since = ics_server.requests[-1]
+    assert status == 304 and etag and since == ics_server.last_modified
+    assert len(events) == 6
+
+
+def test_restamped_feed_downloads_but_reuses_every_event(ics_server, feed):
+    ics_server.serve('calendar.ics')
+    feed.refresh()
+    ics_server.serve('calendar_restamped.ics')   # only DTSTAMPs moved
+    _, stats = feed.refresh()
+    assert stats == {'parsed': 0, 'reused': 6, 'removed': 0, 'feed': 'downloaded'}
+
+
+def test_changed_feed_reparses_only_the_changed_events(ics_server, feed):
+    ics_server.serve('calendar.ics')
+    feed.refresh()
+    ics_server.serve('calendar_changed.ics')   # one SEQUENCE bump, one event cancelled
+    events, stats = feed.refresh()
+    assert stats == {'parsed': 1, 'reused': 4, 'removed': 1, 'feed': 'downloaded'}
+    events = _by_uid(events)
+    assert ('cancelled-lunch', False) not in events
+    assert events[('utc-call', False)]['SUMMARY'] == 'Vendor call (rescheduled)'
+
+
+def test_outage_falls_back_to_the_cached_feed(ics_server, feed, tmp_path):
+    ics_server.serve('calendar.ics')
+    feed.refresh()
+    ics_server.down = True
+    # A new process: empty parsed store, same disk cache
+    cold = CalendarFeed(ics_server.url, str(tmp_path / 'ics_cache'))
+    events, stats = cold.refresh()
+    assert stats['feed'] == 'stale' and stats['parsed'] == 6
+    assert len(events) == 6
+
+
+def test_import_endpoint_upserts_a_window_from_the_fake_feed(app, client, auth, ics_server, monkeypatch):
+    monkeypatch.setenv('ICS_CALENDAR_URL', ics_server.url)
+    ics_server.serve('calendar.ics')
+
+    # All-day feed events (the offsite) are never imported — timed events only
+    response = client.get('/api/import-calendar/20261019/20261023', headers=auth)
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['changes']['inserted'] == 5
+    with app.app_context():
+        titles = sorted((e.start_date.isoformat(), e.title) for e in Event.query.all())
+    assert titles == [
+        ('2026-10-19', 'Budget review'),
+        ('2026-10-19', 'Standup'),            # Mon; Wed 21st is an EXDATE
+        ('2026-10-20', 'Lunch'),
+        ('2026-10-20', 'Vendor call'),
+        ('2026-10-23', 'Standup (moved)'),    # Fri replaced by its RECURRENCE-ID override
+    ]
+
+    # Same feed again: a 304, and the upsert changes nothing
+    again = client.get('/api/import-calendar/20261019/20261023', headers=auth).get_json()
+    assert again['feed']['feed'] == 'not_modified'
+    assert again['changes']['inserted'] == 0 and again['changes']['unchanged'] == 5
+
+    # Rescheduled + cancelled upstream → updated + deleted here, no duplicates
+    ics_server.serve('calendar_changed.ics')
+    changed = client.get('/api/import-calendar/20261019/20261023', headers=auth).get_json()
+    assert (changed['changes']['updated'], changed['changes']['deleted']) == (1, 1)
+    with app.app_context():
+        assert Event.query.count() == 4
+        call = Event.query.filter_by(source_uid='utc-call').one()
+        assert call.start_time.strftime('%H:%M') == '12:00'
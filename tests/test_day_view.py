@@ -0,0 +1,64 @@
+# tests/test_day_view.py
+from datetime import date, time, timedelta
+
+import pytest
+
+from app import db
+from app.models import Event, Goal, Note, Task, TaskStatus
+
+DAY = date.today()
+
+# Statements one /day render may issue, however many rows it shows:
+# daily goals, possible parents, events (one EventWindow), tasks + backlog (one UNION ALL).
+# Notes are fetched by the page's JS, not the render.
+DAY_VIEW_STATEMENT_BUDGET = 4
+
+
+def _seed(app, copies):
+    with app.app_context():
+        week_parent = Goal(title='week', description='', type='weekly', due_date=DAY)
+        db.session.add(week_parent)
+        db.session.flush()
+        for i in range(copies):
+            db.session.add_all([
+                Goal(title=f'daily {i}', description='', type='daily', due_date=DAY,
+                     parent_id=week_parent.id, status=('todo', 'done')[i % 2], rank=i),
+                Event(title=f'all day {i}', start_date=DAY, end_date=DAY, all_day=True),
+                Event(title=f'meeting {i}', start_date=DAY, end_date=DAY,
+                      start_time=time(9 + i % 8), end_time=time(10 + i % 8)),
+                Event(title=f'trip {i}', start_date=DAY - timedelta(days=1), end_date=DAY + timedelta(days=1),
+                      all_day=True),
+                Event(title=f'standup {i}', start_date=DAY - timedelta(days=30), end_date=DAY - timedelta(days=30),
+                      start_time=time(8), end_time=time(8, 15), is_recurring=True, recurrence_rule='daily'),
+                Task(description=f'todo {i}', date=DAY, status=TaskStatus.TODO, rank=i),
+                Task(description=f'late {i}', date=DAY - timedelta(days=3), status=TaskStatus.IN_PROGRESS, rank=i),
+                Task(description=f'done {i}', date=DAY, status=TaskStatus.DONE, rank=i),
+                Task(description=f'someday {i}', status=TaskStatus.BACKLOG, rank=i),
+            ])
+        db.session.add(Note(scope='day', year=DAY.year, month=DAY.month, day=DAY.day, type='prep', content='plan'))
+        db.session.commit()
+
+
+def _render_day(client, auth, count_queries):
+    with count_queries() as statements:
+        response = client.get(f'/day/{DAY.year}/{DAY.month}/{DAY.day}', headers=auth)
+    assert response.status_code == 200
+    return response, statements
+
+
+@pytest.mark.parametrize('copies', [1, 25])
+def test_day_view_stays_within_statement_budget(app, client, auth, count_queries, copies):
+    _seed(app, copies)
+    response, statements = _render_day(client, auth, count_queries)
+    assert len(statements) <= DAY_VIEW_STATEMENT_BUDGET, '\n'.join(statements)
+    body = response.get_data(as_text=True)
+    assert 'meeting 0' in body and 'all day 0' in body and 'standup 0' in body
+    assert 'todo 0' in body and 'late 0' in body and 'someday 0' in body
+
+
+def test_day_view_statement_count_does_not_grow_with_rows(app, client, auth, count_queries):
+    _seed(app, 1)
+    _, few = _render_day(client, auth, count_queries)
+    _seed(app, 40)
+    _, many = _render_day(client, auth, count_queries)
+    assert len(many) == len(few)
@@ -0,0 +1,132 @@
+# tests/test_delta_sync.py
+import io
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Goal, Task, TaskStatus, Tombstone
+from app.transfer import SyncSourceError, import_json_stream, iter_export_json
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """A second database that takes deltas from the `app` fixture (the primary)."""
+    from app import create_app
+    replica_dir = tmp_path / 'replica'
+    replica_dir.mkdir()
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{replica_dir / 'replica.db'}")
+    replica = create_app()
+    replica.config.update(TESTING=True)
+    replica.instance_path = str(replica_dir)
+    yield replica
+    with replica.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def export_delta(app, since, monkeypatch):
+    monkeypatch.setenv('WFM_SYNC_NAME', 'primary')
+    with app.app_context():
+        body = ''.join(iter_export_json(since))
+    monkeypatch.delenv('WFM_SYNC_NAME')
+    return body.encode()
+
+
+def import_delta(replica, body, monkeypatch):
+    monkeypatch.setenv('WFM_SYNC_NAME', 'replica')
+    monkeypatch.setenv('WFM_SYNC_PRIMARY', 'primary')
+    with replica.app_context():
+        counts = import_json_stream(io.BytesIO(body))
+        db.session.commit()
+    return counts
+
+
+def test_delta_round_trip_with_tombstones(app, client, auth, replica, monkeypatch):
+    since = datetime.utcnow() - timedelta(seconds=1)
+    with app.app_context():
+        root = Goal(title='root', description='')
+        db.session.add(root)
+        db.session.flush()
+        db.session.add_all([
+            Goal(title='child', description='', parent_id=root.id),
+            Task(description='keep', date=date(2026, 1, 5), status=TaskStatus.TODO),
+            Task(description='drop', date=date(2026, 1, 5), status=TaskStatus.TODO),
+        ])
+        db.session.commit()
+        drop_id = Task.query.filter_by(description='drop').one().id
+
+    import_delta(replica, export_delta(app, since, monkeypatch), monkeypatch)
+    with replica.app_context():
+        assert sorted(t.description for t in Task.query) == ['drop', 'keep']
+        child = Goal.query.filter_by(title='child').one()
+        assert child.parent.title == 'root' and child.path == f'/{child.parent_id}/{child.id}/'
+
+    second = datetime.utcnow()
+    assert client.delete(f'/api/task/{drop_id}', headers=auth).status_code == 200
+    with app.app_context():
+        assert Tombstone.query.filter_by(table_name='task', row_id=drop_id).count() == 1
+
+    counts = import_delta(replica, export_delta(app, second, monkeypatch), monkeypatch)
+    assert counts['tombstone'] == 1
+    with replica.app_context():
+        assert [t.description for t in Task.query] == ['keep']
+
+
+def test_primary_wins_over_newer_local_edit(app, replica, monkeypatch):
+    since = datetime.utcnow() - timedelta(seconds=1)
+    with app.app_context():
+        db.session.add(Task(description='report', date=date(2026, 1, 5), status=TaskStatus.TODO))
+        db.session.commit()
+    import_delta(replica, export_delta(app, since, monkeypatch), monkeypatch)
+
+    second = datetime.utcnow()
+    with app.app_context():
+        Task.query.one().status = TaskStatus.DONE
+        db.session.commit()
+    with replica.app_context():
+        task = Task.query.one()
+        task.notes = 'local edit, after the primary\'s'
+        task.updated_at = datetime.utcnow() + timedelta(hours=1)
+        db.session.commit()
+
+    counts = import_delta(replica, export_delta(app, second, monkeypatch), monkeypatch)
+    assert counts['task'] == 1
+    with replica.app_context():
+        assert Task.query.one().status == TaskStatus.DONE
+
+
+def test_delta_from_non_primary_is_refused(app, replica, monkeypatch):
+    body = export_delta(app, datetime.utcnow(), monkeypatch)
+    monkeypatch.setenv('WFM_SYNC_PRIMARY', 'someone-else')
+    with replica.app_context(), pytest.raises(SyncSourceError):
+        import_json_stream(io.BytesIO(body))
+
+
+def test_rolled_over_task_still_takes_primary_delta(app, replica, monkeypatch):
+    since = datetime.utcnow() - timedelta(seconds=1)
+    yesterday = date.today() - timedelta(days=1)
+    with app.app_context():
+        db.session.add(Task(description='late', date=yesterday, status=TaskStatus.TODO))
+        db.session.commit()
+    import_delta(replica, export_delta(app, since, monkeypatch), monkeypatch)
+
+    second = datetime.utcnow()
+    with app.app_context():
+        Task.query.one().status = TaskStatus.DONE
+        db.session.commit()
+    with replica.app_context():
+        from app.tasks import rollover_open_tasks
+        stamp = Task.query.one().updated_at
+        assert rollover_open_tasks() == 1
+        db.session.commit()
+        task = Task.query.one()
+        assert task.date == date.today() and task.updated_at == stamp
+        # Housekeeping is not a change: the replica's own delta doesn't re-ship it
+        assert '"late"' not in ''.join(iter_export_json(second))
+
+    counts = import_delta(replica, export_delta(app, second, monkeypatch), monkeypatch)
+    assert counts['task'] == 1
+    with replica.app_context():
+        task = Task.query.one()
+        assert task.status == TaskStatus.DONE and task.date == yesterday
@@ -0,0 +1,45 @@
+# tests/test_goal_tree.py
+from app import db
+from app.goal_tree import rebuild_goal_paths
+from app.models import Goal, Tombstone
+
+
+def _tree(app):
+    """
+    root ─┬─ a ─┬─ a1 ── a1x
+          │     └─ a2
+          └─ b
+    other
+    """
+    with app.app_context():
+        ids = {}
+        for title, parent in [('root', None), ('a', 'root'), ('b', 'root'), ('a1', 'a'),
+                              ('a2', 'a'), ('a1x', 'a1'), ('other', None)]:
+            goal = Goal(title=title, description='', parent_id=ids.get(parent))
+            db.session.add(goal)
+            db.session.flush()
+            ids[title] = goal.id
+        rebuild_goal_paths()
+        db.session.commit()
+        return ids
+
+
+def test_subtree_delete_is_one_statement_and_leaves_tombstones(app, client, auth, count_queries):
+    ids = _tree(app)
+    with count_queries() as statements:
+        response = client.delete(f"/api/goals/{ids['a']}", headers=auth)
+    assert response.get_json() == {'status': 'success', 'deleted': 4}
+    assert sum(s.lstrip().upper().startswith('WITH') and 'DELETE' in s.upper() for s in statements) == 1
+
+    with app.app_context():
+        assert sorted(g.title for g in Goal.query) == ['b', 'other', 'root']
+        tombstones = {t.row_id for t in Tombstone.query.filter_by(table_name='goal')}
+    assert tombstones == {ids['a'], ids['a1'], ids['a2'], ids['a1x']}
+
+
+def test_deleting_a_root_keeps_other_trees(app, client, auth):
+    ids = _tree(app)
+    assert client.delete(f"/api/goals/{ids['root']}", headers=auth).get_json()['deleted'] == 6
+    with app.app_context():
+        assert [g.title for g in Goal.query] == ['other']
+    assert client.delete(f"/api/goals/{ids['root']}", headers=auth).status_code == 404
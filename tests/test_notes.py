@@ -0,0 +1,75 @@
+# tests/test_notes.py
+from app import db
+from app.models import Note
+
+
+def _seed(app):
+    with app.app_context():
+        db.session.add_all([
+            Note(scope='day', year=2026, month=10, day=18, type='prep', content='plan the day'),
+            Note(scope='day', year=2026, month=10, day=18, type='notes', time='14:00', index=2,
+                 content='call back', completed=True),
+            Note(scope='day', year=2026, month=10, day=19, type='prep', content='tomorrow'),
+            Note(scope='month', year=2026, month=10, type='goals', content='october'),
+        ])
+        db.session.commit()
+
+
+def test_bulk_get_returns_one_window_by_key(app, client, auth, count_queries):
+    _seed(app)
+    with count_queries() as statements:
+        response = client.get('/api/notes?scope=day&year=2026&month=10&day=18', headers=auth)
+    assert response.status_code == 200
+    assert response.get_json()['notes'] == {
+        'note-day-2026-10-18-prep': {'content': 'plan the day', 'completed': False},
+        'note-day-2026-10-18-notes-14:00-2': {'content': 'call back', 'completed': True},
+    }
+    assert len(statements) == 1
+
+    month = client.get('/api/notes?scope=month&year=2026&month=10', headers=auth).get_json()['notes']
+    assert month == {'note-month-2026-10-goals': {'content': 'october', 'completed': False}}
+
+
+def test_bulk_get_rejects_a_bad_window(client, auth):
+    assert client.get('/api/notes?year=2026', headers=auth).status_code == 400
+    assert client.get('/api/notes?scope=day', headers=auth).status_code == 400
+    assert client.get('/api/notes?scope=day&year=2026&month=x', headers=auth).status_code == 400
+
+
+def test_bulk_post_round_trip(app, client, auth, count_queries):
+    _seed(app)
+    notes = {
+        'note-day-2026-10-18-prep': {'content': 'plan the day, revised'},          # update
+        'note-day-2026-10-18-notes-14:00-2': {'content': 'call back', 'completed': False},
+        'note-day-2026-10-18-review': {'content': 'went well', 'completed': True},  # insert
+        'note-day-2026-10-18-notes-09:00': {'content': 'standup'},
+    }
+    with count_queries() as statements:
+        response = client.post('/api/notes', headers=auth, json={'notes': notes})
+    assert response.status_code == 200
+    assert response.get_json()['saved'] == 4
+    # One SELECT, one bulk UPDATE, one bulk INSERT per key shape (NULL columns are
+    # left out of an executemany, so notes with and without an hour slot are two)
+    kinds = [s.lstrip().split(None, 1)[0].upper() for s in statements]
+    assert (kinds.count('SELECT'), kinds.count('UPDATE'), kinds.count('INSERT')) == (1, 1, 2)
+
+    saved = client.get('/api/notes?scope=day&year=2026&month=10&day=18', headers=auth).get_json()['notes']
+    assert saved == {key: {'content': value['content'], 'completed': value.get('completed', False)}
+                     for key, value in notes.items()}
+    with app.app_context():
+        assert Note.query.count() == 6
+
+
+def test_bulk_post_is_all_or_nothing(app, client, auth):
+    _seed(app)
+    response = client.post('/api/notes', headers=auth, json={'notes': {
+        'note-day-2026-10-18-prep': {'content': 'overwritten?'},
+        'note-day-2026-13-40-prep': {'content': 'bad date'},
+    }})
+    assert response.status_code == 400
+    assert 'Invalid note key' in response.get_json()['error']
+    with app.app_context():
+        assert Note.query.filter_by(day=18, type='prep').one().content == 'plan the day'
+
+    assert client.post('/api/notes', headers=auth, json={'notes': {}}).status_code == 400
+    assert client.post('/api/notes', headers=auth, json={'notes': {'note-year-2026-goals': 'x'}}).status_code == 400
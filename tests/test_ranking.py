@@ -0,0 +1,75 @@
+# tests/test_ranking.py
+from datetime import date, timedelta
+
+from app import db
+from app.models import Task, TaskStatus
+from app.ranking import RANK_GAP
+
+TODAY = date.today()
+
+
+def _add(app, **columns):
+    with app.app_context():
+        task = Task(**columns)
+        db.session.add(task)
+        db.session.commit()
+        return task.id
+
+
+def _column(app, status=TaskStatus.TODO, day=TODAY):
+    with app.app_context():
+        tasks = Task.query.filter_by(status=status, date=day).order_by(Task.rank, Task.id).all()
+        return [t.description for t in tasks]
+
+
+def _ranks(app):
+    with app.app_context():
+        return {t.description: t.rank for t in Task.query}
+
+
+def test_move_into_an_exhausted_gap_rebalances_only_that_column(app, client, auth):
+    a = _add(app, description='a', status=TaskStatus.TODO, date=TODAY, rank=RANK_GAP)
+    b = _add(app, description='b', status=TaskStatus.TODO, date=TODAY, rank=RANK_GAP + 1)
+    _add(app, description='c', status=TaskStatus.TODO, date=TODAY, rank=3 * RANK_GAP)
+    moving = _add(app, description='moving', status=TaskStatus.TODO, date=TODAY, rank=4 * RANK_GAP)
+    # Same ranks, other columns — a rebalance must not touch them
+    _add(app, description='done today', status=TaskStatus.DONE, date=TODAY, rank=RANK_GAP + 1)
+    _add(app, description='next week', status=TaskStatus.TODO, date=TODAY + timedelta(days=7), rank=RANK_GAP + 1)
+    _add(app, description='someday', status=TaskStatus.BACKLOG, rank=RANK_GAP + 5)
+    before = _ranks(app)
+
+    response = client.post(f'/api/task/{moving}/move', headers=auth, json={'prev_id': a, 'next_id': b})
+    assert response.get_json()['rebalanced'] is True
+    assert _column(app) == ['a', 'moving', 'b', 'c']
+
+    after = _ranks(app)
+    assert after['b'] == before['b'] + RANK_GAP and after['c'] == before['c'] + RANK_GAP
+    assert after['a'] == before['a']
+    for other in ('done today', 'next week', 'someday'):
+        assert after[other] == before[other]
+
+
+def test_repeated_drops_into_one_slot_keep_the_order(app, client, auth):
+    top = _add(app, description='top', status=TaskStatus.TODO, date=TODAY, rank=RANK_GAP)
+    below = _add(app, description='below', status=TaskStatus.TODO, date=TODAY, rank=2 * RANK_GAP)
+    expected = ['top']
+    for i in range(30):   # each lands right under 'top': the gap halves every time
+        moving = _add(app, description=f'drop {i}', status=TaskStatus.TODO, date=TODAY, rank=100 * RANK_GAP)
+        nxt = below if i == 0 else previous
+        assert client.post(f'/api/task/{moving}/move', headers=auth,
+                           json={'prev_id': top, 'next_id': nxt}).status_code == 200
+        expected.insert(1, f'drop {i}')
+        previous = moving
+    assert _column(app) == expected + ['below']
+    assert len(set(_ranks(app).values())) == 32
+
+
+def test_stale_neighbours_are_a_conflict(app, client, auth):
+    a = _add(app, description='a', status=TaskStatus.TODO, date=TODAY, rank=RANK_GAP)
+    b = _add(app, description='b', status=TaskStatus.TODO, date=TODAY, rank=2 * RANK_GAP)
+    moving = _add(app, description='moving', status=TaskStatus.TODO, date=TODAY, rank=3 * RANK_GAP)
+
+    out_of_order = client.post(f'/api/task/{moving}/move', headers=auth, json={'prev_id': b, 'next_id': a})
+    missing = client.post(f'/api/task/{moving}/move', headers=auth, json={'prev_id': a, 'next_id': 999})
+    assert out_of_order.status_code == missing.status_code == 409
+    assert _ranks(app)['moving'] == 3 * RANK_GAP
@@ -0,0 +1,66 @@
+# tests/test_restore.py
+import io
+import os
+import sqlite3
+
+from app import db
+from app.models import Event, Goal, Note, Task, TaskStatus
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _backup_file(tmp_path, extra_sql=''):
+    """The pre-upgrade fixture as a real SQLite file, read back as bytes."""
+    path = tmp_path / 'old_backup.db'
+    with open(os.path.join(FIXTURES, 'backup_pre_upgrade.sql')) as f:
+        script = f.read()
+    conn = sqlite3.connect(path)
+    conn.executescript(script + extra_sql)
+    conn.close()
+    return path.read_bytes()
+
+
+def _restore(client, auth, body):
+    return client.post('/restore', headers=auth, follow_redirects=True, content_type='multipart/form-data',
+                       data={'file': (io.BytesIO(body), 'old_backup.db')})
+
+
+def test_backup_from_before_the_upgrade_is_migrated_on_restore(app, client, auth, tmp_path):
+    response = _restore(client, auth, _backup_file(tmp_path))
+    assert b'Database restored successfully' in response.data
+
+    with app.app_context():
+        goals = {g.title: g for g in Goal.query}
+        root, quarter, month = goals['Ship 2026'], goals['Q1 launch'], goals['Jan beta']
+        assert (month.depth, month.path) == (2, f'/{root.id}/{quarter.id}/{month.id}/')
+        assert all(g.updated_at is not None for g in goals.values())
+        assert Task.query.filter_by(status=TaskStatus.DONE).one().description == 'old thing'
+        assert Note.query.one().content == 'before the upgrade'
+        assert Event.query.one().source_uid is None
+        head = db.session.execute(db.text('SELECT version_num FROM alembic_version')).scalar()
+    assert head == 'f4b8e1a6c920'
+
+
+def test_backup_from_an_unknown_revision_is_refused(app, client, auth, tmp_path):
+    body = _backup_file(tmp_path, "CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL);"
+                                  "INSERT INTO alembic_version VALUES ('0123456789ab');")
+    with app.app_context():
+        db.session.add(Task(description='still here', status=TaskStatus.BACKLOG))
+        db.session.commit()
+
+    response = _restore(client, auth, body)
+    assert b'newer or unknown version of the app' in response.data
+    with app.app_context():
+        assert [t.description for t in Task.query] == ['still here']
+
+
+def test_database_from_another_app_is_refused(app, client, auth, tmp_path):
+    path = tmp_path / 'other.db'
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE invoice (id INTEGER PRIMARY KEY, total REAL)')
+    conn.close()
+
+    response = _restore(client, auth, path.read_bytes())
+    assert b'Schema doesn&#39;t match this app' in response.data
+    with app.app_context():
+        assert Goal.query.count() == 0
@@ -0,0 +1,63 @@
+# tests/test_rollover.py
+from datetime import date, timedelta
+
+from app import db
+from app.models import Task, TaskStatus
+from app.tasks import ensure_rolled_over
+
+TODAY = date.today()
+
+
+def _seed(app):
+    with app.app_context():
+        db.session.add_all([
+            Task(description='late', date=TODAY - timedelta(days=2), status=TaskStatus.TODO),
+            Task(description='stuck', date=TODAY - timedelta(days=9), status=TaskStatus.BLOCKED),
+            Task(description='undated', status=TaskStatus.IN_PROGRESS),
+            Task(description='finished', date=TODAY - timedelta(days=2), status=TaskStatus.DONE),
+            Task(description='someday', status=TaskStatus.BACKLOG),
+            Task(description='next week', date=TODAY + timedelta(days=7), status=TaskStatus.TODO),
+        ])
+        db.session.commit()
+
+
+def _dates(app):
+    with app.app_context():
+        return {t.description: t.date for t in Task.query}
+
+
+def test_rollover_moves_only_open_past_tasks(app):
+    _seed(app)
+    with app.app_context():
+        assert ensure_rolled_over(TODAY + timedelta(days=1)) == 3
+    dates = _dates(app)
+    assert dates['late'] == dates['stuck'] == dates['undated'] == TODAY + timedelta(days=1)
+    assert dates['finished'] == TODAY - timedelta(days=2)
+    assert dates['someday'] is None
+    assert dates['next week'] == TODAY + timedelta(days=7)
+
+
+def test_rollover_runs_once_per_day(app, count_queries):
+    _seed(app)
+    tomorrow = TODAY + timedelta(days=1)
+    with app.app_context():
+        assert ensure_rolled_over(tomorrow) == 3
+        # A task slipping back into the past the same day waits for the next day's run
+        late = Task.query.filter_by(description='late').one()
+        late.date = TODAY - timedelta(days=5)
+        db.session.commit()
+        with count_queries() as statements:
+            assert ensure_rolled_over(tomorrow) == 0
+        assert statements == []
+        assert Task.query.filter_by(description='late').one().date == TODAY - timedelta(days=5)
+        assert ensure_rolled_over(tomorrow + timedelta(days=1)) == 3
+
+
+def test_rollover_runs_on_first_authenticated_request(app, client, auth):
+    _seed(app)
+    with app.app_context():
+        app.extensions['task_rollover']['on'] = None   # as if midnight just passed
+    assert client.get('/').status_code == 401
+    assert _dates(app)['late'] == TODAY - timedelta(days=2)
+    client.get('/', headers=auth)
+    assert _dates(app)['late'] == TODAY
@@ -0,0 +1,83 @@
+# tests/test_task_batch.py
+from datetime import date, timedelta
+
+from app import db
+from app.models import Task, TaskStatus, Tombstone
+
+TODAY = date.today()
+
+
+def _seed(app):
+    with app.app_context():
+        tasks = [
+            Task(description='write report', date=TODAY, status=TaskStatus.TODO, rank=1024),
+            Task(description='review PR', date=TODAY, status=TaskStatus.IN_PROGRESS, rank=2048),
+            Task(description='someday', status=TaskStatus.BACKLOG, rank=1024),
+            Task(description='old junk', date=TODAY - timedelta(days=3), status=TaskStatus.DONE, rank=0),
+        ]
+        db.session.add_all(tasks)
+        db.session.commit()
+        return [t.id for t in tasks]
+
+
+def _tasks(app):
+    with app.app_context():
+        return {t.id: t for t in Task.query}
+
+
+def test_mixed_batch_applies_valid_ops_and_reports_bad_ones(app, client, auth):
+    report, review, someday, junk = _seed(app)
+    ops = [
+        {'op': 'status', 'id': report, 'status': 'done'},
+        {'op': 'status', 'id': review, 'status': 'sideways'},                       # bad status
+        {'op': 'today', 'id': someday},
+        {'op': 'edit', 'id': review, 'fields': {'description': 'review PR #12', 'category': 'work'}},
+        {'op': 'edit', 'id': review, 'fields': {'description': 42}},                # wrong type
+        {'op': 'edit', 'id': review, 'fields': {'owner': 'me'}},                    # not editable
+        {'op': 'delete', 'id': junk},
+        {'op': 'delete', 'id': 99999},                                              # no such task
+        {'op': 'rank', 'id': someday, 'rank': 'first'},                             # not an int
+        {'op': 'rank', 'id': someday, 'prev_id': review, 'next_id': None},
+        {'op': 'teleport', 'id': report},                                           # unknown op
+        'not even an object',
+    ]
+    response = client.post('/api/tasks/batch', headers=auth, json={'ops': ops})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['applied'], body['failed']) == (5, 7)
+    assert [r['ok'] for r in body['results']] == [True, False, True, True, False, False,
+                                                  True, False, False, True, False, False]
+    assert all(r['error'] for r in body['results'] if not r['ok'])
+
+    tasks = _tasks(app)
+    assert junk not in tasks
+    assert (tasks[report].status, tasks[report].date) == (TaskStatus.DONE, TODAY)
+    assert (tasks[someday].status, tasks[someday].date) == (TaskStatus.TODO, TODAY)
+    assert tasks[someday].rank > tasks[review].rank
+    assert (tasks[review].description, tasks[review].category) == ('review PR #12', 'work')
+    assert tasks[review].status == TaskStatus.IN_PROGRESS
+    with app.app_context():
+        assert [t.row_id for t in Tombstone.query] == [junk]
+
+
+def test_batch_shape_is_validated_up_front(client, auth):
+    assert client.post('/api/tasks/batch', headers=auth, json={'ops': []}).status_code == 400
+    assert client.post('/api/tasks/batch', headers=auth, json={'ops': {'op': 'delete'}}).status_code == 400
+    too_many = [{'op': 'delete', 'id': i} for i in range(501)]
+    assert client.post('/api/tasks/batch', headers=auth, json={'ops': too_many}).status_code == 400
+
+
+def test_failed_batch_applies_nothing_and_hides_the_error(app, client, auth, monkeypatch):
+    report, *_ = _seed(app)
+    from app import tasks as task_module
+
+    def broken_flush(kind, run, today):
+        raise RuntimeError('database is locked: /srv/secret/path.db')
+
+    monkeypatch.setattr(task_module, '_flush_run', broken_flush)
+    response = client.post('/api/tasks/batch', headers=auth,
+                           json={'ops': [{'op': 'status', 'id': report, 'status': 'done'}]})
+    assert response.status_code == 500
+    assert response.get_json()['error'] == 'Batch failed — nothing was applied'
+    assert b'secret' not in response.data
+    assert _tasks(app)[report].status == TaskStatus.TODO